@@ -11,9 +11,11 @@ needed.
 """
 
 import argparse
+import functools
 import logging
 import os
 import random
+import re
 import sys
 import time
 from pathlib import Path
@@ -27,6 +29,61 @@ from selenium.webdriver.edge.service import Service as EdgeService
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from webdriver_support import COMMAND_POOL_SIZE, TargetWatcher, pin_command_pool, profile_dir_for
+
+
+POPUP_CLOSE_LABEL_LOCATOR = (By.XPATH, "//span[normalize-space()='Закрыть']")
+POPUP_LOCATORS: Tuple[Tuple[str, str], ...] = (
+    (By.CSS_SELECTOR, "div[class*='popup'] > div > span.close"),
+    (By.CSS_SELECTOR, "[role='dialog'] span.close"),
+    POPUP_CLOSE_LABEL_LOCATOR,
+)
+POPUP_CSS_SELECTORS = tuple(value for by, value in POPUP_LOCATORS if by == By.CSS_SELECTOR)
+POPUP_PROBE_SCRIPT = (
+    "const visible = e => e.offsetParent !== null;"
+    "for (const s of arguments[0]) {"
+    "  const el = [...document.querySelectorAll(s)].find(visible);"
+    "  if (el) { el.click(); return s; }"
+    "}"
+    "const label = [...document.querySelectorAll('span')].find(e => e.textContent.trim() === 'Закрыть' && visible(e));"
+    "if (label) { label.click(); return 'text'; }"
+    "const fallback = [...document.querySelectorAll('span')].find(e =>"
+    "  (e.getAttribute('class') || '').includes('close')"
+    "  && e.textContent.toLowerCase().includes('закрыть') && visible(e));"
+    "if (fallback) { fallback.click(); return 'fallback'; }"
+    "return null;"
+)
+SETTLE_POLL_INTERVAL = 0.1
+STEALTH_SOURCE = (
+    "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});"
+    "Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});"
+    "Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});"
+    "const getParameter = Object.getOwnPropertyDescriptor(Notification, 'permission');"
+    "if (getParameter && getParameter.get) {"
+    "  Object.defineProperty(Notification, 'permission', {get: () => 'default'});"
+    "}"
+)
+DOM_READY_SCRIPT = (
+    "const done = arguments[arguments.length - 1];"
+    "if (document.readyState !== 'loading') { done(true); return; }"
+    "const timer = setTimeout(() => done(false), arguments[0]);"
+    "document.addEventListener('DOMContentLoaded', () => { clearTimeout(timer); done(true); }, {once: true});"
+)
+PAGE_READY_TIMEOUT = 30
+DRIVER_PATH_ENV_VARS = ("EDGE_WEBDRIVER", "EDGE_DRIVER_PATH", "MS_EDGE_DRIVER_PATH")
+AD_KEYWORDS = ("ads", "advert", "doubleclick", "googlesyndication", "adservice", "adnxs", "taboola", "outbrain")
+AD_PATTERN = re.compile("|".join(map(re.escape, AD_KEYWORDS)))
+# Resources never inspected for ad signatures; ad networks themselves stay reachable.
+BLOCKED_RESOURCE_PATTERNS = (
+    "*.jpg",
+    "*.png",
+    "*.webp",
+    "*.woff2",
+    "*.mp4",
+    "*google-analytics*",
+    "*facebook.net*",
+)
+
 
 def setup_logger() -> logging.Logger:
     """Configure a console logger for the test run."""
@@ -43,23 +100,30 @@ def setup_logger() -> logging.Logger:
     return logger
 
 
-def resolve_driver_path(cli_driver_path: Optional[str], logger: logging.Logger) -> Optional[Path]:
-    """Return a resolved driver path from CLI flag or environment variables if provided."""
-    candidates = [
-        cli_driver_path,
-        os.environ.get("EDGE_WEBDRIVER"),
-        os.environ.get("EDGE_DRIVER_PATH"),
-        os.environ.get("MS_EDGE_DRIVER_PATH"),
-    ]
-
+@functools.lru_cache(maxsize=4)
+def _resolve_driver_candidates(candidates: Tuple[Optional[str], ...]) -> Tuple[Optional[Path], Tuple[Path, ...]]:
+    """Return the first existing driver path along with configured paths that were missing."""
+    missing: List[Path] = []
     for candidate in candidates:
         if not candidate:
             continue
         driver_path = Path(candidate).expanduser().resolve()
         if driver_path.exists():
-            logger.info("Using configured Edge driver at %s", driver_path)
-            return driver_path
-        logger.warning("Configured driver path %s was not found", driver_path)
+            return driver_path, tuple(missing)
+        missing.append(driver_path)
+    return None, tuple(missing)
+
+
+def resolve_driver_path(cli_driver_path: Optional[str], logger: logging.Logger) -> Optional[Path]:
+    """Return a resolved driver path from CLI flag or environment variables if provided."""
+    candidates = (cli_driver_path, *(os.environ.get(name) for name in DRIVER_PATH_ENV_VARS))
+    driver_path, missing = _resolve_driver_candidates(candidates)
+
+    for missing_path in missing:
+        logger.warning("Configured driver path %s was not found", missing_path)
+    if driver_path:
+        logger.info("Using configured Edge driver at %s", driver_path)
+        return driver_path
 
     logger.info("No explicit driver path provided; Selenium Manager will resolve the driver")
     return None
@@ -68,19 +132,8 @@ def resolve_driver_path(cli_driver_path: Optional[str], logger: logging.Logger)
 def apply_stealth_settings(driver: webdriver.Edge, logger: logging.Logger) -> None:
     """Minimize automation fingerprints so the session resembles a manual browser."""
     try:
-        user_agent: str = driver.execute_script("return navigator.userAgent")
-        driver.execute_cdp_cmd(
-            "Page.addScriptToEvaluateOnNewDocument",
-            {
-                "source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});"
-                           "Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});"
-                           "Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});"
-                           "const getParameter = Object.getOwnPropertyDescriptor(Notification, 'permission');"
-                           "if (getParameter && getParameter.get) {"
-                           "  Object.defineProperty(Notification, 'permission', {get: () => 'default'});"
-                           "}"
-            },
-        )
+        user_agent: str = driver.execute_cdp_cmd("Browser.getVersion", {})["userAgent"]
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": STEALTH_SOURCE})
         if "Headless" in user_agent:
             driver.execute_cdp_cmd(
                 "Network.setUserAgentOverride",
@@ -91,8 +144,29 @@ def apply_stealth_settings(driver: webdriver.Edge, logger: logging.Logger) -> No
         logger.debug("Unable to apply stealth settings: %s", exc)
 
 
-def create_edge_driver(headless: bool, driver_path: Optional[Path], logger: logging.Logger) -> webdriver.Edge:
-    """Spin up an Edge WebDriver instance with sensible defaults."""
+def block_non_essential_resources(driver: webdriver.Edge, logger: logging.Logger) -> None:
+    """Drop images, fonts, video and analytics requests that ad inspection never looks at."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(BLOCKED_RESOURCE_PATTERNS)})
+        logger.info("Blocking %d non-essential resource patterns", len(BLOCKED_RESOURCE_PATTERNS))
+    except WebDriverException as exc:
+        logger.debug("Unable to block non-essential resources: %s", exc)
+
+
+def create_edge_driver(
+    headless: bool,
+    driver_path: Optional[Path],
+    logger: logging.Logger,
+    fast: bool = False,
+    profile_dir: Optional[Path] = None,
+) -> webdriver.Edge:
+    """Spin up an Edge WebDriver instance with sensible defaults.
+
+    ``fast`` turns off image loading entirely, since only script/iframe nodes are inspected.
+    ``profile_dir`` keeps cookies, DNS/TLS state and HTTP cache warm across launches; leave
+    it unset for a throwaway profile.
+    """
     options = EdgeOptions()
     options.use_chromium = True
     options.add_argument("--disable-gpu")
@@ -104,43 +178,93 @@ def create_edge_driver(headless: bool, driver_path: Optional[Path], logger: logg
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
     options.add_argument("--window-size=1920,1080")
+    # Return from get()/refresh() at DOMContentLoaded instead of waiting on every ad beacon.
+    options.page_load_strategy = "eager"
     if headless:
         options.add_argument("--headless=new")
+    if fast:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    if profile_dir:
+        options.add_argument(f"--user-data-dir={profile_dir}")
 
-    logger.info("Launching Microsoft Edge (headless=%s)", headless)
+    logger.info("Launching Microsoft Edge (headless=%s, fast=%s, profile=%s)", headless, fast, profile_dir or "fresh")
     if driver_path:
         service = EdgeService(executable_path=str(driver_path))
     else:
         service = EdgeService()
     driver = webdriver.Edge(service=service, options=options)
+    if pin_command_pool(driver):
+        logger.debug("Pinned WebDriver connection pool to %d keep-alive connections", COMMAND_POOL_SIZE)
+    else:
+        logger.debug("Leaving WebDriver connection pool unchanged")
     driver.set_page_load_timeout(60)
+    # Leave headroom so the DOM ready listener reports its own timeout first.
+    driver.set_script_timeout(PAGE_READY_TIMEOUT + 5)
     apply_stealth_settings(driver, logger)
+    block_non_essential_resources(driver, logger)
     return driver
 
 
-def wait_for_page_ready(driver: webdriver.Edge, timeout: int = 30, logger: Optional[logging.Logger] = None) -> None:
-    """Block until document.readyState is complete or a timeout occurs."""
+def wait_for_page_ready(driver: webdriver.Edge, timeout: int = PAGE_READY_TIMEOUT, logger: Optional[logging.Logger] = None) -> None:
+    """Block until DOMContentLoaded has fired or a timeout occurs.
+
+    The wait runs as one async script that resolves on the DOM event itself, rather than
+    polling document.readyState with a WebDriver round-trip every 500ms.
+    """
     try:
-        WebDriverWait(driver, timeout).until(
-            lambda web_driver: web_driver.execute_script("return document.readyState") == "complete"
-        )
-    except TimeoutException:
+        ready = driver.execute_async_script(DOM_READY_SCRIPT, timeout * 1000)
+    except WebDriverException as exc:
+        # Covers script timeouts and documents unloaded mid-wait (e.g. a redirect).
         if logger:
-            logger.warning("Timed out waiting for page to reach readyState complete")
-
-
-def close_unexpected_windows(driver: webdriver.Edge, main_handle: str, logger: logging.Logger) -> str:
-    """Close any secondary windows that may have opened (e.g. ad pop-ups)."""
-    current_handles = driver.window_handles
-    for handle in current_handles:
-        if handle == main_handle:
-            continue
-        driver.switch_to.window(handle)
-        logger.info("Closing unexpected window: %s", driver.title or "untitled")
-        driver.close()
-
-    if main_handle not in driver.window_handles and driver.window_handles:
-        main_handle = driver.window_handles[0]
+            logger.debug("DOM ready listener failed: %s", exc)
+        ready = False
+    if not ready and logger:
+        logger.warning("Timed out waiting for page to become interactive")
+
+
+def close_unexpected_windows(
+    driver: webdriver.Edge,
+    main_handle: str,
+    logger: logging.Logger,
+    watcher: Optional[TargetWatcher] = None,
+) -> str:
+    """Close any secondary windows that may have opened (e.g. ad pop-ups).
+
+    With an active ``watcher`` only the targets it reported are closed, and nothing is
+    queried at all when no pop-up opened since the last call.
+    """
+    if watcher is not None and watcher.active:
+        opened = [target_id for target_id in watcher.drain() if target_id != main_handle]
+        if not opened:
+            return main_handle
+        for target_id in opened:
+            try:
+                driver.execute_cdp_cmd("Target.closeTarget", {"targetId": target_id})
+                logger.info("Closing unexpected window: %s", target_id)
+            except WebDriverException as exc:
+                logger.debug("Pop-up %s already closed: %s", target_id, exc)
+    else:
+        try:
+            # Close pop-ups straight through CDP so no per-window switch_to round-trip is needed.
+            current_target = driver.execute_cdp_cmd("Target.getTargetInfo", {})["targetInfo"]["targetId"]
+            for target in driver.execute_cdp_cmd("Target.getTargets", {})["targetInfos"]:
+                if target["type"] != "page" or target["targetId"] in (current_target, main_handle):
+                    continue
+                logger.info("Closing unexpected window: %s", target.get("title") or "untitled")
+                driver.execute_cdp_cmd("Target.closeTarget", {"targetId": target["targetId"]})
+        except WebDriverException as exc:
+            logger.debug("CDP window cleanup failed (%s); closing windows via WebDriver", exc)
+            for handle in driver.window_handles:
+                if handle == main_handle:
+                    continue
+                driver.switch_to.window(handle)
+                logger.info("Closing unexpected window: %s", driver.title or "untitled")
+                driver.close()
+
+    remaining_handles = driver.window_handles
+    if main_handle not in remaining_handles and remaining_handles:
+        main_handle = remaining_handles[0]
         driver.switch_to.window(main_handle)
         logger.warning("Main window changed; switched control to handle %s", main_handle)
     else:
@@ -148,57 +272,73 @@ def close_unexpected_windows(driver: webdriver.Edge, main_handle: str, logger: l
     return main_handle
 
 
-def close_ad_popup_if_present(driver: webdriver.Edge, logger: logging.Logger) -> bool:
-    """Dismiss modal ad popups that expose a close button labelled 'Закрыть'."""
-    popup_locators = [
-        (By.XPATH, "/html/body/div[3]/div/div[2]/span"),
-        (By.XPATH, "/html/body/div/div"),
-        (By.XPATH, "//span[normalize-space()='Закрыть']"),
-    ]
+def close_ad_popup_if_present(
+    driver: webdriver.Edge,
+    logger: logging.Logger,
+    wait: Optional[WebDriverWait] = None,
+) -> bool:
+    """Dismiss modal ad popups that expose a close button labelled 'Закрыть'.
 
-    for locator in popup_locators:
-        try:
-            candidate = WebDriverWait(driver, 2).until(EC.element_to_be_clickable(locator))
-            driver.execute_script("arguments[0].scrollIntoView({behavior: 'instant', block: 'center'});", candidate)
-            candidate.click()
-            logger.info("Closed ad popup using locator %s", locator)
-            return True
-        except TimeoutException:
-            continue
-        except WebDriverException as exc:
-            logger.debug("Attempt to close popup with locator %s failed: %s", locator, exc)
-            continue
+    POPUP_PROBE_SCRIPT finds and clicks the close control in a single round-trip. It is
+    polled for the length of ``wait`` because under the eager load strategy a popup often
+    renders after the page is handed back. Pass a reusable short ``wait`` from hot loops
+    to avoid rebuilding one per call.
+    """
+    if wait is None:
+        wait = WebDriverWait(driver, 2, poll_frequency=SETTLE_POLL_INTERVAL)
 
+    selectors = list(POPUP_CSS_SELECTORS)
     try:
-        fallback_buttons = driver.find_elements(
-            By.XPATH,
-            "//span[contains(@class, 'close') and contains(translate(text(),'ЗАКРЫТЬ','закрыть'),'закрыть')]",
+        matched = wait.until(
+            lambda web_driver: web_driver.execute_script(POPUP_PROBE_SCRIPT, selectors)
         )
-        for button in fallback_buttons:
-            if button.is_displayed() and button.is_enabled():
-                button.click()
-                logger.info("Closed ad popup via fallback close button search")
-                return True
+    except TimeoutException:
+        return False
     except WebDriverException as exc:
-        logger.debug("Fallback popup close search failed: %s", exc)
+        logger.debug("In-page popup probe failed: %s", exc)
+        return False
+    logger.info("Closed ad popup via in-page probe (%s)", matched)
+    return True
 
-    return False
 
+def collect_ad_elements_from_attributes(driver: webdriver.Edge) -> List[Tuple[str, str]]:
+    """Fetch src/outerHTML for every script and iframe in one call and filter them in Python."""
+    elements = driver.find_elements(By.CSS_SELECTOR, "script,iframe")
+    if not elements:
+        return []
 
-def inspect_for_ad_elements(driver: webdriver.Edge, logger: logging.Logger) -> bool:
-    """Look for ad-related script or iframe tags and log what is discovered."""
-    ad_keywords = ("ads", "advert", "doubleclick", "googlesyndication", "adservice", "adnxs", "taboola", "outbrain")
+    rows = driver.execute_script(
+        "return arguments[0].map(e => [e.tagName.toLowerCase(), e.src, e.outerHTML]);",
+        elements,
+    )
     found_elements: List[Tuple[str, str]] = []
+    for element_type, src, outer_html in rows:
+        descriptor = (src or outer_html or "").lower()
+        if AD_PATTERN.search(descriptor):
+            found_elements.append((element_type, descriptor[:160]))
+    return found_elements
 
-    for script_tag in driver.find_elements(By.TAG_NAME, "script"):
-        descriptor = (script_tag.get_attribute("src") or script_tag.get_attribute("outerHTML") or "").lower()
-        if any(keyword in descriptor for keyword in ad_keywords):
-            found_elements.append(("script", descriptor[:160]))
 
-    for iframe in driver.find_elements(By.TAG_NAME, "iframe"):
-        descriptor = (iframe.get_attribute("src") or iframe.get_attribute("outerHTML") or "").lower()
-        if any(keyword in descriptor for keyword in ad_keywords):
-            found_elements.append(("iframe", descriptor[:160]))
+def inspect_for_ad_elements(driver: webdriver.Edge, logger: logging.Logger) -> bool:
+    """Look for ad-related script or iframe tags and log what is discovered."""
+    # Scan and filter inside the page so the whole inspection costs one WebDriver command.
+    try:
+        found_elements: List[Tuple[str, str]] = driver.execute_script(
+            "const pattern = new RegExp(arguments[0]);"
+            "return [...document.querySelectorAll('script,iframe')].flatMap(e => {"
+            "  const d = ((e.src || e.outerHTML) || '').toLowerCase();"
+            "  return pattern.test(d) ? [[e.tagName.toLowerCase(), d.slice(0, 160)]] : [];"
+            "});",
+            AD_PATTERN.pattern,
+        ) or []
+    except WebDriverException as exc:
+        logger.debug("In-page ad scan failed (%s); filtering element attributes locally", exc)
+        try:
+            found_elements = collect_ad_elements_from_attributes(driver)
+        except WebDriverException as fallback_exc:
+            # Usually a stale or mid-navigation page; report nothing rather than end the run.
+            logger.debug("Attribute-based ad scan failed as well: %s", fallback_exc)
+            found_elements = []
 
     if not found_elements:
         logger.warning("Did not detect any ad-related elements on the current view")
@@ -209,6 +349,25 @@ def inspect_for_ad_elements(driver: webdriver.Edge, logger: logging.Logger) -> b
     return True
 
 
+def wait_for_click_outcome(
+    driver: webdriver.Edge, previous_url: str, handles_before: int, timeout: float
+) -> bool:
+    """Wait until a click navigates, opens a window, or surfaces an ad popup."""
+
+    def click_settled(web_driver: webdriver.Edge) -> bool:
+        return (
+            web_driver.current_url != previous_url
+            or len(web_driver.window_handles) != handles_before
+            or bool(web_driver.find_elements(*POPUP_CLOSE_LABEL_LOCATOR))
+        )
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=SETTLE_POLL_INTERVAL).until(click_settled)
+        return True
+    except TimeoutException:
+        return False
+
+
 def interact_with_sushi_card(driver: webdriver.Edge, wait: WebDriverWait, logger: logging.Logger) -> None:
     """Click the Sushi recipe card to mimic user navigation."""
     sushi_card_locator = (By.CSS_SELECTOR, "div.row[role='option'][data-id='53065']")
@@ -234,6 +393,8 @@ def run_ad_navigation_test(
     url: str,
     headless: bool,
     driver_path_override: Optional[str] = None,
+    fast: bool = False,
+    profile_dir: Optional[Path] = None,
 ) -> None:
     logger = setup_logger()
     if min_wait > max_wait:
@@ -242,11 +403,23 @@ def run_ad_navigation_test(
 
     resolved_driver_path = resolve_driver_path(driver_path_override, logger)
     driver: Optional[webdriver.Edge] = None
+    popup_watcher: Optional[TargetWatcher] = None
     max_iterations = iterations if iterations and iterations > 0 else None
     iteration_counter = 1
 
     try:
-        driver = create_edge_driver(headless=headless, driver_path=resolved_driver_path, logger=logger)
+        driver = create_edge_driver(
+            headless=headless,
+            driver_path=resolved_driver_path,
+            logger=logger,
+            fast=fast,
+            profile_dir=profile_dir,
+        )
+        wait = WebDriverWait(driver, 20)
+        popup_wait = WebDriverWait(driver, 2, poll_frequency=SETTLE_POLL_INTERVAL)
+        popup_watcher = TargetWatcher(driver, logger)
+        if not popup_watcher.start():
+            logger.info("CDP pop-up watcher unavailable; scanning targets after each action")
         while True:
             loop_descriptor = (
                 f"{iteration_counter}/{max_iterations}" if max_iterations else f"{iteration_counter}"
@@ -257,16 +430,16 @@ def run_ad_navigation_test(
             main_handle = driver.current_window_handle
             wait_for_page_ready(driver, logger=logger)
             logger.info("Homepage ready")
-            close_ad_popup_if_present(driver, logger)
-            main_handle = close_unexpected_windows(driver, main_handle, logger)
-            wait = WebDriverWait(driver, 20)
+            close_ad_popup_if_present(driver, logger, popup_wait)
+            main_handle = close_unexpected_windows(driver, main_handle, logger, popup_watcher)
             inspect_for_ad_elements(driver, logger)
 
             try:
+                previous_url, handles_before = driver.current_url, len(driver.window_handles)
                 interact_with_sushi_card(driver, wait, logger)
-                time.sleep(2)
-                close_ad_popup_if_present(driver, logger)
-                main_handle = close_unexpected_windows(driver, main_handle, logger)
+                wait_for_click_outcome(driver, previous_url, handles_before, timeout=2)
+                close_ad_popup_if_present(driver, logger, popup_wait)
+                main_handle = close_unexpected_windows(driver, main_handle, logger, popup_watcher)
             except TimeoutException:
                 logger.error("Timed out waiting for Sushi recipe card; continuing")
             except WebDriverException as exc:
@@ -277,15 +450,15 @@ def run_ad_navigation_test(
             main_handle = driver.current_window_handle
             wait_for_page_ready(driver, logger=logger)
             logger.info("Homepage reloaded")
-            close_ad_popup_if_present(driver, logger)
-            main_handle = close_unexpected_windows(driver, main_handle, logger)
-            wait = WebDriverWait(driver, 20)
+            close_ad_popup_if_present(driver, logger, popup_wait)
+            main_handle = close_unexpected_windows(driver, main_handle, logger, popup_watcher)
 
             try:
+                previous_url, handles_before = driver.current_url, len(driver.window_handles)
                 toggle_sushi_favourite(driver, wait, logger)
-                time.sleep(1)
-                close_ad_popup_if_present(driver, logger)
-                main_handle = close_unexpected_windows(driver, main_handle, logger)
+                wait_for_click_outcome(driver, previous_url, handles_before, timeout=1)
+                close_ad_popup_if_present(driver, logger, popup_wait)
+                main_handle = close_unexpected_windows(driver, main_handle, logger, popup_watcher)
             except TimeoutException:
                 logger.error("Timed out waiting for Sushi favourite button; continuing")
             except (NoSuchElementException, WebDriverException) as exc:
@@ -300,8 +473,8 @@ def run_ad_navigation_test(
             driver.refresh()
             wait_for_page_ready(driver, logger=logger)
             logger.info("Refresh complete")
-            close_ad_popup_if_present(driver, logger)
-            main_handle = close_unexpected_windows(driver, main_handle, logger)
+            close_ad_popup_if_present(driver, logger, popup_wait)
+            main_handle = close_unexpected_windows(driver, main_handle, logger, popup_watcher)
             inspect_for_ad_elements(driver, logger)
 
             if max_iterations and iteration_counter >= max_iterations:
@@ -317,6 +490,8 @@ def run_ad_navigation_test(
     finally:
         if driver is not None:
             logger.info("Shutting down Edge driver")
+            if popup_watcher is not None:
+                popup_watcher.stop()
             driver.quit()
 
 
@@ -342,6 +517,16 @@ def parse_arguments() -> argparse.Namespace:
     )
     parser.add_argument("--url", type=str, default="https://sweetmuse.shop/", help="Target URL to test against")
     parser.add_argument("--headed", action="store_true", help="Run browser in headed mode for debugging")
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Disable image loading to speed up page loads (keep off when visually debugging)",
+    )
+    parser.add_argument(
+        "--persistent-profile",
+        action="store_true",
+        help="Reuse this tester's warm-cache profile directory instead of a cold temporary one",
+    )
     parser.add_argument(
         "--driver-path",
         type=str,
@@ -360,4 +545,6 @@ if __name__ == "__main__":
         url=arguments.url,
         headless=not arguments.headed,
         driver_path_override=arguments.driver_path,
-    )
+        fast=arguments.fast,
+        profile_dir=profile_dir_for("edge") if arguments.persistent_profile else None,
+    )
@@ -10,6 +10,7 @@ point at a custom driver executable.
 import argparse
 
 from edge_ad_render_tester import run_ad_navigation_test
+from webdriver_support import profile_dir_for
 
 
 DEFAULT_ITERATIONS = 0
@@ -57,6 +58,16 @@ def parse_arguments() -> argparse.Namespace:
         default=None,
         help="Optional path to a local msedgedriver executable",
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Disable image loading to speed up page loads",
+    )
+    parser.add_argument(
+        "--persistent-profile",
+        action="store_true",
+        help="Reuse this runner's warm-cache profile directory instead of a cold temporary one",
+    )
     return parser.parse_args()
 
 
@@ -69,6 +80,8 @@ def main() -> None:
         url=arguments.url,
         headless=arguments.headless,
         driver_path_override=arguments.driver_path,
+        fast=arguments.fast,
+        profile_dir=profile_dir_for("edge-visible") if arguments.persistent_profile else None,
     )
 
 
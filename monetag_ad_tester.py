@@ -8,42 +8,222 @@ Example setup (PowerShell):
     python -m pip install selenium
 
 Usage:
-    python monetag_ad_tester.py
+    python monetag_ad_tester.py [--persistent-profile]
+
+Each view starts from a fresh browser profile; ``--persistent-profile`` keeps cookies and
+caches in a per-view profile directory across runs.
 """
 
 from __future__ import annotations
 
 import contextlib
+import hashlib
+import json
+import os
 import sys
 import time
-from dataclasses import dataclass
+import weakref
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
 from typing import Iterable, Optional
+from urllib.parse import urlsplit
 
+import trio
+import urllib3
 from selenium import webdriver
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.bidi import cdp
 from selenium.webdriver.common.by import By
 from selenium.webdriver.edge.options import Options as EdgeOptions
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from webdriver_support import TargetWatcher, pin_command_pool, profile_dir_for
+
 
 HOME_URL = "https://logovobezdelnikov.com/"
+HOME_ORIGIN = "{0.scheme}://{0.netloc}".format(urlsplit(HOME_URL))
 AD_IDENTIFIERS: Iterable[tuple[str, str]] = (
     (By.CSS_SELECTOR, "iframe[src*='monetag']"),
     (By.CSS_SELECTOR, "script[src*='monetag']"),
+    (By.CSS_SELECTOR, "[id*='monetag']"),
+    (By.CSS_SELECTOR, "[class*='monetag']"),
+)
+AD_SELECTOR = ", ".join(value for _, value in AD_IDENTIFIERS)
+# Latches window.__monetag_seen the moment a Monetag element is present or inserted, so
+# callers read one flag instead of re-querying the DOM. Safe to run repeatedly per page.
+AD_OBSERVER_SCRIPT = (
+    "const selector = arguments[0];"
+    "if (window.__monetag_observer) return window.__monetag_seen;"
+    "window.__monetag_observer = true;"
+    "window.__monetag_seen = !!document.querySelector(selector);"
+    "if (window.__monetag_seen) return true;"
+    "const observer = new MutationObserver((mutations, obs) => {"
+    "  for (const m of mutations) {"
+    "    const nodes = m.type === 'attributes' ? [m.target] : m.addedNodes;"
+    "    for (const n of nodes) {"
+    "      if (n.nodeType === 1 && (n.matches(selector) || n.querySelector(selector))) {"
+    "        window.__monetag_seen = true;"
+    "        obs.disconnect();"
+    "        return;"
+    "      }"
+    "    }"
+    "  }"
+    "});"
+    "observer.observe(document.documentElement, {"
+    "  childList: true, subtree: true, attributes: true, attributeFilter: ['src', 'id', 'class'],"
+    "});"
+    "return false;"
 )
 DEFAULT_VIEW_COUNT = 3
 DEFAULT_VIEW_DELAY = 5.0  # seconds to keep the page open before refresh/navigation
 WAIT_TIMEOUT = 12  # seconds to wait for ad resources to appear
 CLOSE_BUTTON_LOCATORS: tuple[tuple[str, str], ...] = (
-    (By.XPATH, "//*[@id='root']/div/div[2]/div/button"),
-    (By.XPATH, "//button[@aria-label='Close']"),
-    (By.XPATH, "/html/body/div/div/div[2]/div/button"),
     (By.CSS_SELECTOR, "button[aria-label='Close']"),
+    (By.CSS_SELECTOR, "#root > div > div:nth-of-type(2) > div > button"),
     (By.XPATH, "//button[contains(normalize-space(.),'✕')]"),
 )
 OVERLAY_WAIT = 6
+# Reads nav-button visibility/hrefs and the URL in one in-page call; see snapshot_nav.
+NAV_SNAPSHOT_SCRIPT = (
+    "const firstVisible = selector => {"
+    "  for (const el of document.querySelectorAll(selector)) {"
+    "    const rect = el.getBoundingClientRect();"
+    "    if (rect.width > 0 && rect.height > 0) return {href: el.href || ''};"
+    "  }"
+    "  return null;"
+    "};"
+    "return {home: firstVisible(arguments[0]), games: firstVisible(arguments[1]), url: location.href};"
+)
+# Summarises interactive elements; an unchanged summary means no new overlay appeared.
+# Covers controls, iframes (ad slots swap their src), whatever sits at the viewport
+# centre and fixed-position layers, so a bare div or iframe overlay changes the hash too.
+FINGERPRINT_SCRIPT = (
+    "let summary = '';"
+    "for (const el of document.querySelectorAll('button, a, [role=dialog]')) {"
+    "  summary += el.tagName + el.className + (el.textContent || '').slice(0, 16) + '|';"
+    "}"
+    "for (const frame of document.querySelectorAll('iframe')) {"
+    "  summary += 'IFRAME' + (frame.src || '') + '|';"
+    "}"
+    "for (const el of document.elementsFromPoint(innerWidth / 2, innerHeight / 2)) {"
+    "  summary += el.tagName + el.className + '@';"
+    "}"
+    "for (const el of document.body ? document.body.children : []) {"
+    "  const style = getComputedStyle(el);"
+    "  if (style.position === 'fixed' && style.display !== 'none') {"
+    "    summary += 'FIXED' + el.tagName + el.className + style.zIndex + '|';"
+    "  }"
+    "}"
+    "return summary;"
+)
+# Client-side route back to "/" (React Router listens for popstate). Dropping the observer
+# marker makes the next ad check start a fresh latch for the re-rendered view. pushState
+# works on any origin, so a tab a popunder redirected elsewhere is reported (false)
+# instead of being routed by the foreign page's own router.
+SPA_HOME_SCRIPT = (
+    "if (location.origin !== arguments[0]) return false;"
+    "window.__monetag_observer = false;"
+    "history.pushState({}, '', '/');"
+    "window.dispatchEvent(new PopStateEvent('popstate'));"
+    "return true;"
+)
+SPA_NAVIGATION_WAIT = 3.0
+# After a click navigates in place, popups it spawns get this long to show up.
+CLICK_SETTLE_WAIT = 1.0
+# Clicks a CSS selector or WebElement in-page; null means missing or disabled.
+JS_CLICK_SCRIPT = (
+    "const el = typeof arguments[0] === 'string'"
+    "  ? document.querySelector(arguments[0]) : arguments[0];"
+    "if (!el || el.disabled) return null;"
+    "el.scrollIntoView({block: 'center'});"
+    "el.click();"
+    "return {href: el.href || ''};"
+)
+# Resources the harness never inspects; Monetag iframes and scripts stay unblocked.
+BLOCKED_RESOURCE_PATTERNS: tuple[str, ...] = (
+    "*.jpg",
+    "*.png",
+    "*.webp",
+    "*.woff2",
+    "*.mp4",
+    "*google-analytics*",
+    "*facebook.net*",
+)
+# Third-party ad networks blocked only while resetting the page (see block_ad_networks).
+# Monetag is deliberately absent: its script must load with the page for clicks to matter.
+AD_NETWORK_PATTERNS: tuple[str, ...] = ("*doubleclick*", "*googlesyndication*")
+POPUP_SPAWN_WAIT = 1.0  # upper bound for first-visit popups to appear after navigation
+POPUP_BURST_WAIT = 0.5  # quiet period after the latest new target before a batch is complete
+POPUP_AD_WAIT = 3.0  # how long a settled popup gets to show Monetag markers
+POPUP_WORKERS = 8  # popups inspected concurrently, each over its own CDP session
+# Evaluated inside each popup target; yields [url, has Monetag markers].
+POPUP_PROBE_EXPRESSION = f"[location.href, !!document.querySelector({json.dumps(AD_SELECTOR)})]"
+POLL_FREQUENCY = 0.1  # Selenium's 0.5s default floors every wait at half a second
+PAGE_IDLE_POLL_INTERVAL = 0.5  # resource count must hold steady this long to count as idle
+# Counts resource entries with a PerformanceObserver, which keeps seeing them after the
+# 250-entry resource timing buffer fills up and getEntriesByType() stops growing.
+PAGE_IDLE_SCRIPT = (
+    "if (!window.__monetag_resources) {"
+    "  const counter = window.__monetag_resources = {"
+    "    count: performance.getEntriesByType('resource').length,"
+    "  };"
+    "  new PerformanceObserver((list) => { counter.count += list.getEntries().length; })"
+    "    .observe({type: 'resource'});"
+    "}"
+    "return [document.readyState, window.__monetag_resources.count];"
+)
+RESULTS_PATH = Path("monetag_results.jsonl")  # tester results are appended here, one per line
+
+
+@dataclass
+class SessionState:
+    """Per-driver bookkeeping the helpers below keep between calls."""
+
+    clean_fingerprint: Optional[str] = None
+    ad_networks_blocked: bool = False
+    watcher: Optional[TargetWatcher] = None
+    devtools_endpoint: Optional[tuple[str, str]] = None
+
+
+_sessions: weakref.WeakKeyDictionary[webdriver.Edge, SessionState] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def session_state(driver: webdriver.Edge) -> SessionState:
+    """Return the SessionState for ``driver``, creating it on first use."""
+    state = _sessions.get(driver)
+    if state is None:
+        state = _sessions[driver] = SessionState()
+    return state
+
+
+def target_watcher(driver: webdriver.Edge) -> TargetWatcher:
+    """Return the session's shared TargetWatcher, starting it on first use.
+
+    Check ``active`` before relying on it; managed_driver() stops it on exit.
+    """
+    state = session_state(driver)
+    if state.watcher is None:
+        state.watcher = TargetWatcher(driver)
+        state.watcher.start()
+    return state.watcher
+
+
+@dataclass
+class PopupReport:
+    target_id: str
+    url: str
+    ads_detected: bool
+    error: Optional[str] = None
 
 
 @dataclass
@@ -53,22 +233,155 @@ class ViewResult:
     error: Optional[str] = None
 
 
-def build_edge_driver(headless: bool = True) -> webdriver.Edge:
-    """Configure and return an Edge WebDriver instance."""
+class ResultLog:
+    """Append tester results to a JSONL file as they arrive and keep running totals.
+
+    ``stats`` counts ``total``, ``ads`` and ``errors`` so summaries never need the full
+    result history in memory. The file is line-buffered, so every recorded result is on
+    disk even if the run dies part-way; ``path`` is where it is being written.
+    """
+
+    def __init__(self, suite: str, path: Path = RESULTS_PATH) -> None:
+        self.suite = suite
+        self.path = Path(path).resolve()
+        self.stats: Counter[str] = Counter()
+        self._fp = open(self.path, "a", encoding="utf-8", buffering=1)
+
+    def record(self, result) -> None:
+        """Write one dataclass result and fold it into ``stats``."""
+        self._fp.write(json.dumps({"suite": self.suite, **asdict(result)}) + "\n")
+        self.stats["total"] += 1
+        self.stats["ads"] += bool(result.ads_detected)
+        self.stats["errors"] += bool(result.error)
+
+    def close(self) -> None:
+        self._fp.close()
+
+    def __enter__(self) -> ResultLog:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def polling_wait(driver: webdriver.Edge, timeout: float) -> WebDriverWait:
+    """Return a WebDriverWait that polls every POLL_FREQUENCY seconds and tolerates re-renders."""
+    return WebDriverWait(
+        driver,
+        timeout,
+        poll_frequency=POLL_FREQUENCY,
+        ignored_exceptions=(StaleElementReferenceException,),
+    )
+
+
+def build_edge_driver(
+    headless: bool = True, profile_dir: Optional[Path] = None
+) -> webdriver.Edge:
+    """Configure and return an Edge WebDriver instance.
+
+    Pass ``profile_dir`` to reuse a persistent user-data directory; ``None`` launches a
+    throwaway profile.
+    """
     options = EdgeOptions()
     options.use_chromium = True
 
     if headless:
         # "new" headless mode keeps parity with visible Edge across versions 118+.
         options.add_argument("--headless=new")
+        # Ads are detected from the DOM, so unwatched runs can skip decoding images.
+        options.add_argument("--blink-settings=imagesEnabled=false")
 
     options.add_argument("--disable-gpu")
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--no-sandbox")
     options.add_argument("--window-size=1920,1080")
     options.add_argument("--log-level=3")  # suppress noisy driver logs
+    options.page_load_strategy = "eager"  # don't block navigation on third-party ad resources
+    if profile_dir:
+        options.add_argument(f"--user-data-dir={profile_dir}")
+
+    driver = webdriver.Edge(options=options)
+    pin_command_pool(driver)
+    session_state(driver)
+    with contextlib.suppress(WebDriverException):
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd(
+            "Network.setBlockedURLs", {"urls": list(BLOCKED_RESOURCE_PATTERNS)}
+        )
+    return driver
 
-    return webdriver.Edge(options=options)
+
+def block_ad_networks(driver: webdriver.Edge, blocked: bool = True) -> None:
+    """Block or unblock AD_NETWORK_PATTERNS on top of BLOCKED_RESOURCE_PATTERNS.
+
+    Network.setBlockedURLs replaces the whole list, so the static patterns are always
+    resent; the call is skipped when the requested state is already in effect.
+    """
+    state = session_state(driver)
+    if blocked == state.ad_networks_blocked:
+        return
+    patterns = BLOCKED_RESOURCE_PATTERNS + (AD_NETWORK_PATTERNS if blocked else ())
+    with contextlib.suppress(WebDriverException):
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+        state.ad_networks_blocked = blocked
+
+
+def collect_new_windows(
+    driver: webdriver.Edge,
+    before_handles: set[str],
+    watcher: Optional[TargetWatcher] = None,
+) -> list[str]:
+    """Return handles of windows opened since ``before_handles`` was captured.
+
+    With an active ``watcher`` a reported batch is only returned once no further target
+    has appeared for POPUP_BURST_WAIT, so popups a click opens in quick succession stay
+    together.
+    """
+    if watcher is not None and watcher.active:
+        return [
+            target_id
+            for target_id in watcher.collect(POPUP_BURST_WAIT)
+            if target_id not in before_handles
+        ]
+    return list(set(driver.window_handles) - before_handles)
+
+
+def close_targets(
+    driver: webdriver.Edge,
+    target_ids: Iterable[str],
+    watcher: Optional[TargetWatcher] = None,
+    timeout: float = 2.0,
+) -> bool:
+    """Close windows by target id via CDP and return True once they are confirmed gone.
+
+    Never switches windows, so the focused tab stays put. With an active ``watcher`` the
+    confirmation comes from Target.targetDestroyed events; otherwise Target.getTargets
+    is polled.
+    """
+    watching = watcher is not None and watcher.active
+    target_ids = set(target_ids)
+    if watching:
+        watcher.expect_closed(target_ids)
+    closing: set[str] = set()
+    for target_id in target_ids:
+        try:
+            driver.execute_cdp_cmd("Target.closeTarget", {"targetId": target_id})
+            closing.add(target_id)
+        except WebDriverException:
+            pass  # the popup already closed itself
+    if watching:
+        watcher.forget(target_ids - closing)
+        return watcher.wait_closed(closing, timeout)
+
+    def gone(web_driver: webdriver.Edge) -> bool:
+        targets = web_driver.execute_cdp_cmd("Target.getTargets", {})["targetInfos"]
+        return not closing & {target["targetId"] for target in targets}
+
+    try:
+        polling_wait(driver, timeout).until(gone)
+        return True
+    except (TimeoutException, WebDriverException):
+        return False
 
 
 def close_additional_windows(driver: webdriver.Edge) -> None:
@@ -78,19 +391,408 @@ def close_additional_windows(driver: webdriver.Edge) -> None:
     except WebDriverException:
         return
 
-    for handle in list(driver.window_handles):
-        if handle == primary_handle:
-            continue
-        with contextlib.suppress(WebDriverException):
-            driver.switch_to.window(handle)
-            driver.close()
+    try:
+        # Close other page targets through CDP so we never have to switch into them.
+        current_target = driver.execute_cdp_cmd("Target.getTargetInfo", {})["targetInfo"]["targetId"]
+        for target in driver.execute_cdp_cmd("Target.getTargets", {})["targetInfos"]:
+            if target["type"] != "page" or target["targetId"] in (current_target, primary_handle):
+                continue
+            with contextlib.suppress(WebDriverException):
+                driver.execute_cdp_cmd("Target.closeTarget", {"targetId": target["targetId"]})
+    except WebDriverException:
+        for handle in list(driver.window_handles):
+            if handle == primary_handle:
+                continue
+            with contextlib.suppress(WebDriverException):
+                driver.switch_to.window(handle)
+                driver.close()
 
     with contextlib.suppress(WebDriverException):
         driver.switch_to.window(primary_handle)
 
 
-def dismiss_initial_overlay(driver: webdriver.Edge, debug_label: str = "") -> None:
-    """Attempt to click the first-visit close button or dismiss overlay ads."""
+def page_fingerprint(driver: webdriver.Edge) -> str:
+    """Return a hash of the page's controls, iframes and overlay layers."""
+    summary = driver.execute_script(FINGERPRINT_SCRIPT) or ""
+    return hashlib.sha1(summary.encode("utf-8")).hexdigest()
+
+
+def view_unchanged_since_cleanup(driver: webdriver.Edge) -> bool:
+    """Return True if only one window is open and the page still matches its last clean state."""
+    clean_fingerprint = session_state(driver).clean_fingerprint
+    if clean_fingerprint is None:
+        return False
+    try:
+        return (
+            len(driver.window_handles) == 1
+            and page_fingerprint(driver) == clean_fingerprint
+        )
+    except WebDriverException:
+        return False
+
+
+def mark_view_clean(driver: webdriver.Edge) -> None:
+    """Remember the current page as overlay-free for view_unchanged_since_cleanup().
+
+    Call only after dismiss_initial_overlay() reported success.
+    """
+    state = session_state(driver)
+    try:
+        state.clean_fingerprint = page_fingerprint(driver)
+    except WebDriverException:
+        state.clean_fingerprint = None
+
+
+def wait_for_popup_quiescence(
+    driver: webdriver.Edge, handles_before: set[str], timeout: float = 2
+) -> set[str]:
+    """Wait until new windows have opened and stopped changing, then return the handle set.
+
+    Returns as soon as the window set differs from ``handles_before`` and is stable
+    across two consecutive polls; otherwise gives up after ``timeout`` seconds.
+    """
+    last_seen = set(handles_before)
+
+    def settled(web_driver: webdriver.Edge) -> bool:
+        nonlocal last_seen
+        current = set(web_driver.window_handles)
+        is_stable = current == last_seen and current != handles_before
+        last_seen = current
+        return is_stable
+
+    with contextlib.suppress(TimeoutException):
+        polling_wait(driver, timeout).until(settled)
+    return last_seen
+
+
+def snapshot_nav(driver: webdriver.Edge, home_css: str, games_css: str) -> dict:
+    """Return ``{home, games, url}`` for the nav bar in a single WebDriver round-trip.
+
+    ``home``/``games`` are ``{"href": ...}`` for the first visible match of the given CSS
+    selector lists, or ``None`` when nothing matching is visible.
+    """
+    return driver.execute_script(NAV_SNAPSHOT_SCRIPT, home_css, games_css)
+
+
+def wait_for_nav_buttons(
+    driver: webdriver.Edge, home_css: str, games_css: str, timeout: float
+) -> bool:
+    """Return True once both nav buttons are visible, polling one snapshot per tick."""
+
+    def both_visible(web_driver: webdriver.Edge) -> bool:
+        snapshot = snapshot_nav(web_driver, home_css, games_css)
+        return bool(snapshot["home"] and snapshot["games"])
+
+    try:
+        polling_wait(driver, timeout).until(both_visible)
+        return True
+    except TimeoutException:
+        return False
+
+
+def js_click(driver: webdriver.Edge, target) -> Optional[dict]:
+    """Click ``target`` (CSS selector or WebElement) with one execute_script call.
+
+    Returns ``{"href": ...}`` for the clicked element, or None if it is missing or
+    disabled, so it can be used directly as a WebDriverWait condition.
+    """
+    return driver.execute_script(JS_CLICK_SCRIPT, target)
+
+
+def return_home(
+    driver: webdriver.Edge, home_css: str, games_css: str, load_timeout: float
+) -> bool:
+    """Route the SPA back to the home page, reloading HOME_URL only if it did not re-render.
+
+    A tab that ended up off HOME_URL's origin (e.g. redirected to an advertiser) is
+    reloaded straight away. Returns True when client-side navigation was enough, False
+    after a full page load.
+    """
+    try:
+        if driver.execute_script(SPA_HOME_SCRIPT, HOME_ORIGIN):
+            polling_wait(driver, SPA_NAVIGATION_WAIT).until(
+                lambda web_driver: web_driver.execute_script("return location.pathname") == "/"
+            )
+            if wait_for_nav_buttons(driver, home_css, games_css, SPA_NAVIGATION_WAIT):
+                install_ad_observer(driver)
+                return True
+    except WebDriverException:
+        pass  # e.g. the document was swapped mid-script; fall back to a full load
+
+    block_ad_networks(driver)  # lifted again right before the next click under test
+    driver.get(HOME_URL)
+    install_ad_observer(driver)
+    wait_for_nav_buttons(driver, home_css, games_css, load_timeout)
+    return False
+
+
+def wait_for_click_effect(
+    driver: webdriver.Edge,
+    before_handles: set[str],
+    previous_url: str,
+    timeout: float,
+    watcher: Optional[TargetWatcher] = None,
+) -> bool:
+    """Wait until a click opens a window or finishes navigating; ``timeout`` caps the wait.
+
+    A new window ends the wait at once. An in-place navigation (SPA clicks change the URL
+    immediately) keeps waiting CLICK_SETTLE_WAIT longer for popups the click spawns. With
+    an active ``watcher`` new windows are read from its queue rather than polled.
+    """
+    navigated_at: Optional[float] = None
+
+    def clicked(web_driver: webdriver.Edge) -> bool:
+        nonlocal navigated_at
+        if watcher is not None and watcher.active:
+            if watcher.pending():
+                return True
+        elif not set(web_driver.window_handles) <= before_handles:
+            return True
+        if navigated_at is None:
+            if (
+                web_driver.current_url != previous_url
+                and web_driver.execute_script("return document.readyState") == "complete"
+            ):
+                navigated_at = time.monotonic()
+            return False
+        return time.monotonic() - navigated_at >= CLICK_SETTLE_WAIT
+
+    try:
+        polling_wait(driver, timeout).until(clicked)
+        return True
+    except TimeoutException:
+        return navigated_at is not None
+
+
+def popup_target_urls(
+    driver: webdriver.Edge, target_ids: Iterable[str], timeout: float
+) -> dict[str, str]:
+    """Return ``{target_id: url}`` for popups, read via Target.getTargetInfo without switching.
+
+    Waits up to ``timeout`` for the popups to leave about:blank, polling only those still
+    blank; popups that close themselves in the meantime are left out.
+    """
+    urls = {target_id: "" for target_id in target_ids}
+    pending = set(urls)
+
+    def settled(web_driver: webdriver.Edge) -> bool:
+        for target_id in list(pending):
+            try:
+                info = web_driver.execute_cdp_cmd(
+                    "Target.getTargetInfo", {"targetId": target_id}
+                )["targetInfo"]
+            except WebDriverException:
+                pending.discard(target_id)
+                del urls[target_id]
+                continue
+            urls[target_id] = info["url"]
+            if info["url"] not in ("", "about:blank"):
+                pending.discard(target_id)
+        return not pending
+
+    with contextlib.suppress(TimeoutException):
+        polling_wait(driver, timeout).until(settled)
+    return urls
+
+
+def devtools_endpoint(driver: webdriver.Edge) -> Optional[tuple[str, str]]:
+    """Return ``(websocket_url, major_version)`` of Edge's DevTools endpoint, if reachable.
+
+    The endpoint is fixed for the life of the browser, so it is fetched once per session.
+    """
+    state = session_state(driver)
+    if state.devtools_endpoint is not None:
+        return state.devtools_endpoint
+    address = (driver.capabilities.get("ms:edgeOptions") or {}).get("debuggerAddress")
+    if not address:
+        return None
+    try:
+        with urllib3.PoolManager() as http:
+            response = http.request("GET", f"http://{address}/json/version", timeout=2.0)
+        info = json.loads(response.data)
+        state.devtools_endpoint = (
+            info["webSocketDebuggerUrl"],
+            info["Browser"].split("/")[-1].split(".")[0],
+        )
+    except (urllib3.exceptions.HTTPError, ValueError, KeyError):
+        return None
+    return state.devtools_endpoint
+
+
+async def _probe_popup(
+    ws_url: str, devtools, target_id: str, timeout: float
+) -> tuple[str, bool]:
+    """Poll one popup over its own CDP session until Monetag markers show or time runs out."""
+    url = ""
+    async with cdp.open_cdp(ws_url) as connection:
+        target = devtools.target.TargetID(target_id)
+        async with connection.open_session(target) as session:
+            deadline = trio.current_time() + timeout
+            while True:
+                # Evaluation fails while the popup swaps documents; just poll again.
+                with contextlib.suppress(cdp.BrowserError):
+                    result, exception_details = await session.execute(
+                        devtools.runtime.evaluate(
+                            expression=POPUP_PROBE_EXPRESSION, return_by_value=True
+                        )
+                    )
+                    # A throwing expression reports exceptionDetails and no [url, has_ads].
+                    if exception_details is None and isinstance(result.value, list):
+                        url, has_ads = result.value
+                        if has_ads:
+                            return url, True
+                if trio.current_time() >= deadline:
+                    return url, False
+                await trio.sleep(POLL_FREQUENCY)
+
+
+def inspect_popups(
+    driver: webdriver.Edge,
+    target_ids: Iterable[str],
+    main_handle: str,
+    settle_timeout: float,
+    ad_timeout: float = POPUP_AD_WAIT,
+) -> list[PopupReport]:
+    """Report each popup's URL and whether it shows Monetag markers, leaving focus on main.
+
+    Popups are probed concurrently via Runtime.evaluate on per-target CDP sessions, so N
+    popups cost about one wait instead of N. Without a reachable DevTools endpoint this
+    falls back to switching into each popup in turn.
+    """
+    target_ids = list(target_ids)
+    if not target_ids:
+        return []
+    endpoint = devtools_endpoint(driver)
+    if endpoint is None:
+        return _inspect_popups_by_switching(
+            driver, target_ids, main_handle, settle_timeout, ad_timeout
+        )
+
+    ws_url, version = endpoint
+    devtools = cdp.import_devtools(version)
+    timeout = settle_timeout + ad_timeout
+
+    def probe(target_id: str) -> PopupReport:
+        try:
+            url, has_ads = trio.run(_probe_popup, ws_url, devtools, target_id, timeout)
+            return PopupReport(target_id=target_id, url=url, ads_detected=has_ads)
+        except Exception as exc:  # e.g. the popup closed itself mid-probe
+            return PopupReport(target_id=target_id, url="", ads_detected=False, error=str(exc))
+
+    with ThreadPoolExecutor(max_workers=min(len(target_ids), POPUP_WORKERS)) as executor:
+        return list(executor.map(probe, target_ids))
+
+
+def _inspect_popups_by_switching(
+    driver: webdriver.Edge,
+    target_ids: list[str],
+    main_handle: str,
+    settle_timeout: float,
+    ad_timeout: float,
+) -> list[PopupReport]:
+    reports: list[PopupReport] = []
+    for target_id, url in popup_target_urls(driver, target_ids, settle_timeout).items():
+        try:
+            driver.switch_to.window(target_id)
+            reports.append(
+                PopupReport(
+                    target_id=target_id,
+                    url=url,
+                    ads_detected=wait_for_ads(driver, timeout=ad_timeout),
+                )
+            )
+        except WebDriverException as exc:
+            reports.append(
+                PopupReport(target_id=target_id, url=url, ads_detected=False, error=str(exc))
+            )
+    with contextlib.suppress(WebDriverException):
+        driver.switch_to.window(main_handle)
+    return reports
+
+
+def inspect_and_close_popups(
+    driver: webdriver.Edge,
+    label: str,
+    handles: list[str],
+    main_handle: str,
+    settle_timeout: float,
+    popup_urls: list[str],
+    debug_notes: list[str],
+    watcher: Optional[TargetWatcher] = None,
+    known_handles: Optional[set[str]] = None,
+) -> bool:
+    """Inspect and close ``handles``, noting their URLs; return True if any showed ads.
+
+    URLs of popups that could be inspected go to ``popup_urls`` and problems to
+    ``debug_notes``. Confirmed closes are dropped from ``known_handles`` when given.
+    """
+    ads_detected = False
+    for popup in inspect_popups(driver, handles, main_handle, settle_timeout):
+        if popup.error:
+            debug_notes.append(f"popup handling error: {popup.error}")
+            continue
+        print(f"[{label}] Popup window detected: {popup.url}")
+        popup_urls.append(popup.url)
+        if popup.ads_detected:
+            ads_detected = True
+            debug_notes.append("popup contained Monetag elements")
+
+    if close_targets(driver, handles, watcher):
+        if known_handles is not None:
+            known_handles.difference_update(handles)
+    else:
+        debug_notes.append("popup close not confirmed")
+    return ads_detected
+
+
+def wait_for_visible(
+    driver: webdriver.Edge, locator: tuple[str, str], timeout: float
+) -> bool:
+    """Return True once ``locator`` is visible, or False after ``timeout`` seconds."""
+    try:
+        polling_wait(driver, timeout).until(
+            EC.visibility_of_element_located(locator)
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_page_idle(driver: webdriver.Edge, timeout: float) -> bool:
+    """Wait until the page has loaded and stopped fetching new resources."""
+    last_count: Optional[int] = None
+
+    def idle(web_driver: webdriver.Edge) -> bool:
+        nonlocal last_count
+        ready_state, resource_count = web_driver.execute_script(PAGE_IDLE_SCRIPT)
+        is_idle = ready_state == "complete" and resource_count == last_count
+        last_count = resource_count
+        return is_idle
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=PAGE_IDLE_POLL_INTERVAL).until(idle)
+        return True
+    except TimeoutException:
+        return False
+
+
+def close_control_visible(driver: webdriver.Edge) -> bool:
+    """Return True if any CLOSE_BUTTON_LOCATORS match is still displayed (or can't be checked)."""
+    try:
+        return any(
+            element.is_displayed()
+            for locator in CLOSE_BUTTON_LOCATORS
+            for element in driver.find_elements(*locator)
+        )
+    except WebDriverException:
+        return True
+
+
+def dismiss_initial_overlay(driver: webdriver.Edge, debug_label: str = "") -> bool:
+    """Attempt to click the first-visit close button or dismiss overlay ads.
+
+    Returns True once a close control was clicked or none is left on the page.
+    """
     label = f"[overlay {debug_label}]".strip() if debug_label else "[overlay]"
 
     def log(message: str) -> None:
@@ -99,17 +801,18 @@ def dismiss_initial_overlay(driver: webdriver.Edge, debug_label: str = "") -> No
     try:
         primary_handle = driver.current_window_handle
     except WebDriverException:
-        return
+        return False
 
     # Try each provided locator in order.
+    wait = polling_wait(driver, OVERLAY_WAIT)
     for locator_by, locator_value in CLOSE_BUTTON_LOCATORS:
         try:
-            button = WebDriverWait(driver, OVERLAY_WAIT).until(
+            button = wait.until(
                 EC.element_to_be_clickable((locator_by, locator_value))
             )
             button.click()
             log(f"Closed via locator {locator_by} => {locator_value}")
-            return
+            return True
         except TimeoutException:
             log(f"Locator timed out: {locator_by} => {locator_value}")
         except WebDriverException as exc:
@@ -122,18 +825,20 @@ def dismiss_initial_overlay(driver: webdriver.Edge, debug_label: str = "") -> No
     try:
         body = driver.find_element(By.TAG_NAME, "body")
         body.click()
-        time.sleep(0.5)
     except WebDriverException as exc:
         log(f"Body click failed: {exc}; trying offset click.")
         try:
             ActionChains(driver).move_by_offset(10, 10).click().perform()
-            time.sleep(0.5)
         except WebDriverException as nested_exc:
             log(f"Offset click failed: {nested_exc}")
-            return
+            return not close_control_visible(driver)
 
-    after_handles = set(driver.window_handles)
+    after_handles = wait_for_popup_quiescence(driver, before_handles, timeout=0.5)
     new_handles = list(after_handles - before_handles)
+    watcher = session_state(driver).watcher
+    if watcher is not None:
+        # These popunders come from our own body click, not from the click under test.
+        watcher.ignore(new_handles)
 
     for handle in new_handles:
         with contextlib.suppress(WebDriverException):
@@ -148,28 +853,42 @@ def dismiss_initial_overlay(driver: webdriver.Edge, debug_label: str = "") -> No
         log("Reloading page after closing popup(s).")
         with contextlib.suppress(WebDriverException):
             driver.get(current_url)
-            time.sleep(0.8)
+            polling_wait(driver, 0.8).until(
+                EC.any_of(
+                    *(EC.presence_of_element_located(locator) for locator in CLOSE_BUTTON_LOCATORS)
+                )
+            )
 
     for locator_by, locator_value in CLOSE_BUTTON_LOCATORS:
         try:
             button = driver.find_element(locator_by, locator_value)
             button.click()
             log(f"Closed after retry via {locator_by}.")
-            return
+            return True
         except WebDriverException as exc:
             log(f"Retry close failed for {locator_by}: {exc}")
+    return not close_control_visible(driver)
+
+
+def install_ad_observer(driver: webdriver.Edge) -> None:
+    """Start latching Monetag insertions on the current document (call after each get)."""
+    with contextlib.suppress(WebDriverException):
+        driver.execute_script(AD_OBSERVER_SCRIPT, AD_SELECTOR)
 
 
 def wait_for_ads(driver: webdriver.Edge, timeout: int = WAIT_TIMEOUT) -> bool:
-    """Return True once any Monetag-related resource becomes visible, else False."""
-    wait = WebDriverWait(driver, timeout)
-    for locator in AD_IDENTIFIERS:
-        try:
-            wait.until(EC.presence_of_element_located(locator))
-            return True
-        except TimeoutException:
-            continue
-    return False
+    """Return True once any Monetag-related resource has appeared, else False.
+
+    Each poll reads the in-page observer flag, installing the observer first if the
+    current document does not have one yet (e.g. a freshly opened popup).
+    """
+    try:
+        polling_wait(driver, timeout).until(
+            lambda web_driver: web_driver.execute_script(AD_OBSERVER_SCRIPT, AD_SELECTOR)
+        )
+        return True
+    except TimeoutException:
+        return False
 
 
 def simulate_view(
@@ -178,10 +897,33 @@ def simulate_view(
     url: str = HOME_URL,
     dwell_seconds: float = DEFAULT_VIEW_DELAY,
 ) -> ViewResult:
-    """Open the target URL, wait for ads, and keep the tab alive briefly."""
+    """Open the target URL, wait for ads, and keep the tab alive briefly.
+
+    First-visit popups are picked up from the session's TargetWatcher; without one the
+    window handles are polled until they settle. Either way any other leftover tab (e.g.
+    Edge's welcome page) is closed afterwards.
+    """
     try:
-        driver.get(url)
-        time.sleep(1.0)  # allow any first-visit popups to spawn
+        watcher = target_watcher(driver)
+        if watcher.active:
+            main_handle = driver.current_window_handle
+            watcher.drain()
+            driver.get(url)
+            install_ad_observer(driver)
+            # Allow any first-visit popups to spawn, returning once the burst ends. The
+            # main tab's own discovery event may still be queued, so never close it.
+            popups = [
+                target_id
+                for target_id in watcher.collect(POPUP_BURST_WAIT, wait=POPUP_SPAWN_WAIT)
+                if target_id != main_handle
+            ]
+            if popups:
+                close_targets(driver, popups, watcher)
+        else:
+            handles_before = set(driver.window_handles)
+            driver.get(url)
+            install_ad_observer(driver)
+            wait_for_popup_quiescence(driver, handles_before, timeout=POPUP_SPAWN_WAIT)
         close_additional_windows(driver)
         dismiss_initial_overlay(driver, debug_label=f"view {view_number}")
         ads_visible = wait_for_ads(driver)
@@ -193,45 +935,81 @@ def simulate_view(
 
 
 @contextlib.contextmanager
-def managed_driver(headless: bool = True):
-    """Context manager that ensures the WebDriver shuts down cleanly."""
+def managed_driver(headless: bool = True, profile_dir: Optional[Path] = None):
+    """Context manager that ensures the WebDriver shuts down cleanly.
+
+    Launches a throwaway profile unless ``profile_dir`` is given (see profile_dir_for()).
+    """
     driver = None
     try:
-        driver = build_edge_driver(headless=headless)
+        driver = build_edge_driver(headless=headless, profile_dir=profile_dir)
         yield driver
     finally:
         if driver:
+            watcher = session_state(driver).watcher
+            if watcher is not None:
+                watcher.stop()
             driver.quit()
 
 
+def reset(driver: webdriver.Edge) -> None:
+    """Return a shared session to a cookie-free home page between suites."""
+    close_additional_windows(driver)
+    driver.delete_all_cookies()
+    block_ad_networks(driver)
+    driver.get(HOME_URL)
+    install_ad_observer(driver)
+    session_state(driver).clean_fingerprint = None
+
+
+def run_isolated_view(
+    view_number: int,
+    dwell_seconds: float = DEFAULT_VIEW_DELAY,
+    headless: bool = True,
+    persistent_profile: bool = False,
+) -> ViewResult:
+    """Simulate one view on a dedicated driver so views can run in separate processes."""
+    profile_dir = profile_dir_for(f"monetag-view{view_number}") if persistent_profile else None
+    with managed_driver(headless=headless, profile_dir=profile_dir) as driver:
+        return simulate_view(driver, view_number=view_number, dwell_seconds=dwell_seconds)
+
+
 def perform_test_cycle(
     views: int = DEFAULT_VIEW_COUNT,
     dwell_seconds: float = DEFAULT_VIEW_DELAY,
     headless: bool = True,
+    persistent_profile: bool = False,
 ) -> list[ViewResult]:
-    """Run the requested number of simulated views."""
+    """Run the requested number of simulated views, each on its own driver in parallel."""
+    if views <= 0:
+        return []
+
     results: list[ViewResult] = []
-    with managed_driver(headless=headless) as driver:
-        for view_number in range(1, views + 1):
-            result = simulate_view(
-                driver, view_number=view_number, dwell_seconds=dwell_seconds
-            )
+    view_numbers = range(1, views + 1)
+    max_workers = min(views, os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        outcomes = executor.map(
+            run_isolated_view,
+            view_numbers,
+            [dwell_seconds] * views,
+            [headless] * views,
+            [persistent_profile] * views,
+        )
+        for result in outcomes:
             if result.error:
-                print(f"[!] View {view_number}: error -> {result.error}")
+                print(f"[!] View {result.number}: error -> {result.error}")
             else:
                 verb = "found" if result.ads_detected else "missing"
-                print(f"[+] View {view_number}: ads {verb}")
+                print(f"[+] View {result.number}: ads {verb}")
             results.append(result)
 
-            if view_number != views:
-                driver.refresh()
-
     return results
 
 
 def main(argv: list[str]) -> int:
+    persistent_profile = "--persistent-profile" in argv[1:]
     try:
-        results = perform_test_cycle()
+        results = perform_test_cycle(persistent_profile=persistent_profile)
     except WebDriverException as exc:
         print(f"Failed to initialise Edge WebDriver: {exc}")
         return 1
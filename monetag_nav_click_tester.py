@@ -2,41 +2,61 @@
 Exercise the main navigation and log when Monetag ads spawn during user interactions.
 
 Usage:
-    python monetag_nav_click_tester.py
+    python monetag_nav_click_tester.py [--visual] [--persistent-profile]
+
+Runs headless unless ``--visual`` is given. Each run starts from a fresh browser profile;
+``--persistent-profile`` keeps cookies and caches in this tester's own profile directory.
 """
 
 from __future__ import annotations
 
 import contextlib
-import time
+import sys
+from collections import Counter
 from dataclasses import dataclass
+from pathlib import Path
 from typing import List, Optional, Tuple
 
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
 from monetag_ad_tester import (
     HOME_URL,
+    RESULTS_PATH,
+    ResultLog,
+    block_ad_networks,
     close_additional_windows,
+    collect_new_windows,
     dismiss_initial_overlay,
+    inspect_and_close_popups,
+    install_ad_observer,
+    js_click,
     managed_driver,
+    mark_view_clean,
+    polling_wait,
+    profile_dir_for,
+    return_home,
+    target_watcher,
+    view_unchanged_since_cleanup,
     wait_for_ads,
+    wait_for_click_effect,
+    wait_for_nav_buttons,
+    wait_for_visible,
 )
 
 
 TOGGLE_ITERATIONS = 16
-POST_CLICK_WAIT = 2.5
+POST_CLICK_WAIT = 2.5  # upper bound; waits return as soon as the click takes effect
 POPUP_SETTLE_WAIT = 3.0
+HOME_READY_WAIT = 5.0
 
-NAV_BUTTONS: Tuple[Tuple[str, Tuple[str, str]], ...] = (
-    ("Home", (By.XPATH, "//*[@id='root']/div/div/div/nav/a[1]")),
-    ("Games", (By.XPATH, "//*[@id='root']/div/div/div/nav/a[2]")),
-)
+# Plain CSS so every lookup goes straight to querySelector in the page.
+HOME_CSS = "#root > div > div > div > nav > a:nth-of-type(1)"
+GAMES_CSS = "#root > div > div > div > nav > a:nth-of-type(2)"
+NAV_BUTTONS: Tuple[Tuple[str, str], ...] = (("Home", HOME_CSS), ("Games", GAMES_CSS))
 
 
-@dataclass
+@dataclass(slots=True)
 class ClickResult:
     iteration: int
     clicked_label: str
@@ -50,171 +70,194 @@ class ClickResult:
 
 def are_both_buttons_visible(driver, timeout: float = 2.5) -> bool:
     """Verify both nav buttons are visible."""
-    try:
-        home = WebDriverWait(driver, timeout).until(
-            EC.visibility_of_element_located(NAV_BUTTONS[0][1])
-        )
-        games = WebDriverWait(driver, timeout).until(
-            EC.visibility_of_element_located(NAV_BUTTONS[1][1])
-        )
-        return home.is_displayed() and games.is_displayed()
-    except TimeoutException:
-        return False
+    return wait_for_nav_buttons(driver, HOME_CSS, GAMES_CSS, timeout)
 
 
 def prepare_main_view(driver, iteration_label: str) -> None:
     """Ensure only the primary tab is open and overlays are dismissed."""
+    if view_unchanged_since_cleanup(driver):
+        return
     close_additional_windows(driver)
-    dismiss_initial_overlay(driver, debug_label=iteration_label)
-
-
-def exercise_navigation(iterations: int = TOGGLE_ITERATIONS) -> list[ClickResult]:
-    """Toggle between the Home and Games buttons, logging when ads appear."""
-    results: list[ClickResult] = []
-    with managed_driver(headless=False) as driver:
+    if dismiss_initial_overlay(driver, debug_label=iteration_label):
+        mark_view_clean(driver)
+
+
+def exercise_navigation(
+    iterations: int = TOGGLE_ITERATIONS,
+    results_path: Path = RESULTS_PATH,
+    headless: bool = True,
+    profile_dir: Optional[Path] = None,
+) -> Counter[str]:
+    """Toggle between the Home and Games buttons on a dedicated Edge session."""
+    with managed_driver(headless=headless, profile_dir=profile_dir) as driver, ResultLog(
+        "navigation", results_path
+    ) as log:
+        return exercise_navigation_with(driver, log, iterations)
+
+
+def exercise_navigation_with(
+    driver, log: ResultLog, iterations: int = TOGGLE_ITERATIONS
+) -> Counter[str]:
+    """Toggle between the Home and Games buttons on ``driver``, logging when ads appear.
+
+    Each ClickResult is streamed to ``log``; the returned counter holds its totals.
+    """
+    if driver.current_url != HOME_URL:  # a shared session may already be home
         driver.get(HOME_URL)
-        time.sleep(1.5)
-
-        main_handle = driver.current_window_handle
-        prepare_main_view(driver, "initial load")
-
-        button_index = 0
-
-        for iteration in range(1, iterations + 1):
-            label = f"iteration {iteration}"
-            try:
-                target_label, target_locator = NAV_BUTTONS[button_index]
-                button_index = (button_index + 1) % len(NAV_BUTTONS)
-
-                print(f"[{label}] Clicking '{target_label}'.")
+    install_ad_observer(driver)
+    wait_for_visible(driver, (By.CSS_SELECTOR, HOME_CSS), HOME_READY_WAIT)
+
+    main_handle = driver.current_window_handle
+    watcher = target_watcher(driver)
+    prepare_main_view(driver, "initial load")
+    # Windows known to be open; updated from click deltas instead of re-listing handles.
+    known_handles = {main_handle}
+
+    button_index = 0
+
+    for iteration in range(1, iterations + 1):
+        label = f"iteration {iteration}"
+        try:
+            target_label, target_css = NAV_BUTTONS[button_index]
+            button_index = (button_index + 1) % len(NAV_BUTTONS)
+
+            print(f"[{label}] Clicking '{target_label}'.")
+
+            watcher.drain()  # forget windows opened and closed before this click
+            before_handles = known_handles.copy()
+            previous_url = driver.current_url
+            block_ad_networks(driver, blocked=False)
+            # Clicks as soon as the button exists and is enabled; one call per poll.
+            clicked = polling_wait(driver, 5).until(
+                lambda d: js_click(d, target_css)
+            )
+            href = clicked["href"]
+            wait_for_click_effect(
+                driver, before_handles, previous_url, POST_CLICK_WAIT, watcher
+            )
+
+            both_buttons_visible = are_both_buttons_visible(driver)
+            print(
+                f"[{label}] Both buttons visible after click: {both_buttons_visible}."
+            )
+
+            popup_urls: list[str] = []
+            ads_detected = False
+            debug_notes: list[str] = []
+
+            new_handles = collect_new_windows(driver, before_handles, watcher)
+            known_handles.update(new_handles)
+            if new_handles:
+                debug_notes.append(f"new handles: {len(new_handles)}")
+                ads_detected = inspect_and_close_popups(
+                    driver, label, new_handles, main_handle, POPUP_SETTLE_WAIT,
+                    popup_urls, debug_notes, watcher, known_handles,
+                )
+                debug_notes.append("returned to main handle after popup(s)")
+                if not return_home(driver, HOME_CSS, GAMES_CSS, HOME_READY_WAIT):
+                    debug_notes.append("reloaded home page")
+
+            # Popups reported after the first batch (during inspection or the trip home)
+            # still belong to this click; prepare_main_view() would close them unseen.
+            late_handles = collect_new_windows(driver, known_handles, watcher)
+            if late_handles:
+                known_handles.update(late_handles)
+                debug_notes.append(f"late handles: {len(late_handles)}")
+                if inspect_and_close_popups(
+                    driver, label, late_handles, main_handle, POPUP_SETTLE_WAIT,
+                    popup_urls, debug_notes, watcher, known_handles,
+                ):
+                    ads_detected = True
+
+            if new_handles or late_handles:
+                prepare_main_view(driver, label)
+                both_buttons_visible = are_both_buttons_visible(driver, timeout=4)
+                debug_notes.append(
+                    f"buttons visible after reload: {both_buttons_visible}"
+                )
 
-                button = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable(target_locator)
+            if not both_buttons_visible:
+                debug_notes.append("buttons missing, retrying overlay dismissal")
+                dismiss_initial_overlay(driver, debug_label=label)
+                both_buttons_visible = are_both_buttons_visible(driver, timeout=3)
+                debug_notes.append(
+                    f"buttons visible after overlay retry: {both_buttons_visible}"
                 )
-                href = button.get_attribute("href") or ""
 
-                before_handles = set(driver.window_handles)
-                button.click()
-                time.sleep(POST_CLICK_WAIT)
+            ads_detected = ads_detected or not both_buttons_visible
+            if not ads_detected:
+                if wait_for_ads(driver, timeout=2):
+                    ads_detected = True
+                    debug_notes.append("Monetag elements detected on main page")
+
+            log.record(
+                ClickResult(
+                    iteration=iteration,
+                    clicked_label=target_label,
+                    href=href,
+                    ads_detected=ads_detected,
+                    both_buttons_visible=both_buttons_visible,
+                    popup_urls=popup_urls,
+                    debug_notes="; ".join(debug_notes) if debug_notes else None,
+                )
+            )
 
-                both_buttons_visible = are_both_buttons_visible(driver)
+            if ads_detected:
                 print(
-                    f"[{label}] Both buttons visible after click: {both_buttons_visible}."
+                    f"[+] {label}: ad activity observed "
+                    f"(clicked='{target_label}', popups={len(popup_urls)})"
                 )
-
-                popup_urls: list[str] = []
-                ads_detected = False
-                debug_notes: list[str] = []
-
-                after_handles = set(driver.window_handles)
-                new_handles = list(after_handles - before_handles)
-                if new_handles:
-                    debug_notes.append(f"new handles: {len(new_handles)}")
-
-                for handle in new_handles:
-                    try:
-                        driver.switch_to.window(handle)
-                        print(f"[{label}] Popup window detected: {driver.current_url}")
-                        time.sleep(POPUP_SETTLE_WAIT)
-                        popup_urls.append(driver.current_url)
-                        if wait_for_ads(driver, timeout=3):
-                            ads_detected = True
-                            debug_notes.append("popup contained Monetag elements")
-                    except (TimeoutException, WebDriverException) as exc:
-                        debug_notes.append(f"popup handling error: {exc}")
-                    finally:
-                        with contextlib.suppress(WebDriverException):
-                            driver.close()
-
-                with contextlib.suppress(WebDriverException):
-                    driver.switch_to.window(main_handle)
-
-                if new_handles:
-                    debug_notes.append("returned to main handle after popup(s)")
-                    driver.get(HOME_URL)
-                    time.sleep(1.2)
-                    prepare_main_view(driver, label)
-                    both_buttons_visible = are_both_buttons_visible(driver, timeout=4)
-                    debug_notes.append(
-                        f"buttons visible after reload: {both_buttons_visible}"
-                    )
-
-                if not both_buttons_visible:
-                    debug_notes.append("buttons missing, retrying overlay dismissal")
-                    dismiss_initial_overlay(driver, debug_label=label)
-                    both_buttons_visible = are_both_buttons_visible(driver, timeout=3)
-                    debug_notes.append(
-                        f"buttons visible after overlay retry: {both_buttons_visible}"
-                    )
-
-                ads_detected = ads_detected or not both_buttons_visible
-                if not ads_detected:
-                    if wait_for_ads(driver, timeout=2):
-                        ads_detected = True
-                        debug_notes.append("Monetag elements detected on main page")
-
-                results.append(
-                    ClickResult(
-                        iteration=iteration,
-                        clicked_label=target_label,
-                        href=href,
-                        ads_detected=ads_detected,
-                        both_buttons_visible=both_buttons_visible,
-                        popup_urls=popup_urls,
-                        debug_notes="; ".join(debug_notes) if debug_notes else None,
-                    )
+            else:
+                print(
+                    f"[-] {label}: no ad activity (clicked='{target_label}')"
                 )
-
-                if ads_detected:
-                    print(
-                        f"[+] {label}: ad activity observed "
-                        f"(clicked='{target_label}', popups={len(popup_urls)})"
-                    )
-                else:
-                    print(
-                        f"[-] {label}: no ad activity (clicked='{target_label}')"
-                    )
-            except Exception as exc:
-                results.append(
-                    ClickResult(
-                        iteration=iteration,
-                        clicked_label="<unknown>",
-                        href="",
-                        ads_detected=False,
-                        both_buttons_visible=False,
-                        popup_urls=[],
-                        error=str(exc),
-                    )
+        except Exception as exc:
+            log.record(
+                ClickResult(
+                    iteration=iteration,
+                    clicked_label="<unknown>",
+                    href="",
+                    ads_detected=False,
+                    both_buttons_visible=False,
+                    popup_urls=[],
+                    error=str(exc),
                 )
-                print(f"[!] {label}: error -> {exc}")
+            )
+            print(f"[!] {label}: error -> {exc}")
 
-                with contextlib.suppress(WebDriverException):
-                    driver.switch_to.window(main_handle)
-                driver.get(HOME_URL)
-                time.sleep(1.5)
-                prepare_main_view(driver, f"{label} recovery")
+            with contextlib.suppress(WebDriverException):
+                driver.switch_to.window(main_handle)
+            return_home(driver, HOME_CSS, GAMES_CSS, HOME_READY_WAIT)
+            prepare_main_view(driver, f"{label} recovery")
+            known_handles = {main_handle}
 
-    return results
+    return log.stats
 
 
-def main() -> int:
+def main(argv: list[str]) -> int:
+    visual = "--visual" in argv[1:]
+    persistent = "--persistent-profile" in argv[1:]
+    results_path = RESULTS_PATH.resolve()
     try:
-        results = exercise_navigation()
+        stats = exercise_navigation(
+            results_path=results_path,
+            headless=not visual,
+            profile_dir=profile_dir_for("monetag-navigation") if persistent else None,
+        )
     except WebDriverException as exc:
         print(f"Failed to initialise Edge WebDriver: {exc}")
         return 1
 
-    issues = [result for result in results if result.error]
-    if issues:
-        print(f"\nCompleted with {len(issues)} error(s).")
+    if stats["errors"]:
+        print(f"\nCompleted with {stats['errors']} error(s).")
     else:
-        detected = [result for result in results if result.ads_detected]
         print(
-            f"\n{len(detected)} of {len(results)} interactions surfaced Monetag ad activity."
+            f"\n{stats['ads']} of {stats['total']} interactions surfaced Monetag ad activity."
         )
+    print(f"Per-click results appended to {results_path}.")
 
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(main(sys.argv))
@@ -2,50 +2,86 @@
 Looped tester that focuses on the Games button (Play) and watches for Monetag ads.
 
 Usage:
-    python monetag_play_button_tester.py
+    python monetag_play_button_tester.py [--visual] [--persistent-profile]
+
+Runs headless unless ``--visual`` is given. Each run starts from a fresh browser profile;
+``--persistent-profile`` keeps cookies and caches in this tester's own profile directory.
 """
 
 from __future__ import annotations
 
-import contextlib
-import time
+import sys
+from collections import Counter
 from dataclasses import dataclass
+from pathlib import Path
 from typing import List, Optional
 
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
 from monetag_ad_tester import (
     HOME_URL,
+    RESULTS_PATH,
+    ResultLog,
+    block_ad_networks,
     close_additional_windows,
+    collect_new_windows,
     dismiss_initial_overlay,
+    inspect_and_close_popups,
+    install_ad_observer,
+    js_click,
     managed_driver,
+    mark_view_clean,
+    polling_wait,
+    profile_dir_for,
+    return_home,
+    target_watcher,
+    view_unchanged_since_cleanup,
     wait_for_ads,
+    wait_for_click_effect,
+    wait_for_nav_buttons,
+    wait_for_page_idle,
+    wait_for_visible,
 )
 
+from webdriver_support import TargetWatcher
+
 
+# Upper bounds; each wait returns as soon as its condition is met.
 INITIAL_WAIT = 5.0
 RETRY_WAIT = 7.0
 POST_CLICK_WAIT = 3.5
 POPUP_SETTLE_WAIT = 3.5
+HOME_READY_WAIT = 5.0
 ATTEMPTS = 12
-
-HOME_LOCATORS = (
-    (By.XPATH, "//*[@id='root']/div/div/div/nav/a[1]"),
-    (By.XPATH, "/html/body/div/div/div/div/nav/a[1]"),
-    (By.CSS_SELECTOR, "nav[aria-label='Main navigation'] a[href='/']"),
-)
-GAMES_LOCATORS = (
-    (By.XPATH, "//*[@id='root']/div/div/div/nav/a[2]"),
-    (By.XPATH, "/html/body/div/div/div/div/nav/a[2]"),
-    (By.CSS_SELECTOR, "nav[aria-label='Main navigation'] a[href='/game']"),
-    (By.LINK_TEXT, "Games"),
+LOCATOR_WAIT = 4.0  # until the Games button is both visible and enabled
+
+# Former XPath locators pre-translated to CSS and joined into one selector list each, so
+# every lookup is a single querySelectorAll in the page.
+HOME_CSS = ", ".join((
+    "#root > div > div > div > nav > a:nth-of-type(1)",
+    "body > div > div > div > div > nav > a:nth-of-type(1)",
+    "nav[aria-label='Main navigation'] a[href='/']",
+))
+GAMES_CSS = ", ".join((
+    "#root > div > div > div > nav > a:nth-of-type(2)",
+    "body > div > div > div > div > nav > a:nth-of-type(2)",
+    "nav[aria-label='Main navigation'] a[href='/game']",
+    "nav a[href$='/game']",
+))
+
+# Returns [element, href] for the first visible, enabled match of a CSS selector list.
+JS_FIND_FIRST_CLICKABLE = (
+    "for (const el of document.querySelectorAll(arguments[0])) {"
+    "  if (el.disabled) continue;"
+    "  const rect = el.getBoundingClientRect();"
+    "  if (rect.width > 0 && rect.height > 0) return [el, el.href || ''];"
+    "}"
+    "return null;"
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayAttemptResult:
     attempt: int
     href: str
@@ -58,77 +94,94 @@ class PlayAttemptResult:
 
 def are_nav_buttons_visible(driver, timeout: float = 3.0) -> bool:
     """Return True if both Home and Games buttons are present and displayed."""
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        home = find_first_visible(driver, HOME_LOCATORS)
-        games = find_first_visible(driver, GAMES_LOCATORS)
-        if home and games:
-            return True
-        time.sleep(0.2)
-    return False
-
-
-def find_first_visible(driver, locators):
-    """Return the first element located via any locator that is displayed."""
-    for by, value in locators:
-        try:
-            element = WebDriverWait(driver, 1.5).until(
-                EC.presence_of_element_located((by, value))
-            )
-            if element.is_displayed():
-                return element
-        except TimeoutException:
-            continue
-        except WebDriverException:
-            continue
-    return None
+    return wait_for_nav_buttons(driver, HOME_CSS, GAMES_CSS, timeout)
+
+
+def find_first_clickable(driver, css: str, timeout: float = LOCATOR_WAIT):
+    """Return ``(element, href)`` for the first displayed, enabled match of ``css``, else None.
+
+    Visibility and enabled state are checked together in one in-page pass, so each
+    attempt is one round-trip.
+    """
+    try:
+        return polling_wait(driver, timeout).until(
+            lambda d: d.execute_script(JS_FIND_FIRST_CLICKABLE, css)
+        )
+    except (TimeoutException, WebDriverException):
+        return None
 
 
 def prepare_main_view(driver, context_label: str) -> None:
     """Ensure the main window is focused and overlays are cleared."""
+    if view_unchanged_since_cleanup(driver):
+        return
     close_additional_windows(driver)
-    dismiss_initial_overlay(driver, debug_label=context_label)
+    if dismiss_initial_overlay(driver, debug_label=context_label):
+        mark_view_clean(driver)
+
+
+def note_late_popups(
+    driver, result: PlayAttemptResult, main_handle: str, watcher: Optional[TargetWatcher]
+) -> None:
+    """Fold popups reported after the click's first batch (e.g. on the way home) into ``result``.
+
+    prepare_main_view() would otherwise close them without inspecting them.
+    """
+    late_handles = collect_new_windows(driver, {main_handle}, watcher)
+    if not late_handles:
+        return
+    debug = [result.debug_notes] if result.debug_notes else []
+    debug.append(f"late popup handles: {len(late_handles)}")
+    inspected_before = len(result.popup_urls)
+    if inspect_and_close_popups(
+        driver, f"attempt {result.attempt}", late_handles, main_handle, POPUP_SETTLE_WAIT,
+        result.popup_urls, debug, watcher,
+    ) or len(result.popup_urls) > inspected_before:
+        result.ads_detected = True  # an inspected popup from the click is ad activity
+    result.debug_notes = "; ".join(debug)
 
 
 def click_games_button(
-    driver, attempt: int, main_handle: str
+    driver, attempt: int, main_handle: str, watcher: Optional[TargetWatcher] = None
 ) -> PlayAttemptResult:
     """Click the Games button, monitor for ads, and return the outcome."""
     label = f"attempt {attempt}"
     debug: list[str] = []
 
-    try:
-        button = find_first_visible(driver, GAMES_LOCATORS)
-        if button is None:
-            raise TimeoutException("Games button not visible via known locators.")
-        WebDriverWait(driver, 2.5).until(lambda d: button.is_enabled())
-    except TimeoutException as exc:
+    match = find_first_clickable(driver, GAMES_CSS)
+    if match is None:
         return PlayAttemptResult(
             attempt=attempt,
             href="",
             ads_detected=False,
             buttons_visible=False,
             popup_urls=[],
-            error=f"Games button not clickable: {exc}",
-        )
-
-    href = button.get_attribute("href") or ""
-    with contextlib.suppress(WebDriverException):
-        driver.execute_script(
-            "arguments[0].scrollIntoView({block: 'center', inline: 'center'});",
-            button,
+            error="Games button not clickable: no visible, enabled match for known locators.",
         )
-        time.sleep(0.2)
+    button, href = match
 
-    before_handles = set(driver.window_handles)
+    if watcher is not None and watcher.active:
+        watcher.drain()  # forget windows opened and closed before this click
+    # prepare_main_view() runs before every attempt, so only the main window is open.
+    before_handles = {main_handle}
+    previous_url = driver.current_url
     print(f"[{label}] Clicking Games button -> {href or '<no href>'}")
+    block_ad_networks(driver, blocked=False)
+    # Only the click's side effects (popups/ads) matter, so skip native pointer emulation.
     try:
-        button.click()
+        js_click(driver, button)
     except WebDriverException as exc:
-        debug.append(f"native click failed: {exc}; using JS click")
-        driver.execute_script("arguments[0].click();", button)
+        return PlayAttemptResult(
+            attempt=attempt,
+            href=href,
+            ads_detected=False,
+            buttons_visible=False,
+            popup_urls=[],
+            error=f"Games button click failed: {exc}",
+        )
 
-    time.sleep(POST_CLICK_WAIT)
+    wait_for_click_effect(driver, before_handles, previous_url, POST_CLICK_WAIT, watcher)
+    new_handles = collect_new_windows(driver, before_handles, watcher)
 
     dismiss_initial_overlay(driver, debug_label=f"{label} post-click")
 
@@ -138,30 +191,12 @@ def click_games_button(
     popup_urls: list[str] = []
     ads_detected = False
 
-    after_handles = set(driver.window_handles)
-    new_handles = list(after_handles - before_handles)
     if new_handles:
         debug.append(f"popup handles: {len(new_handles)}")
-
-    for handle in new_handles:
-        try:
-            driver.switch_to.window(handle)
-            print(f"[{label}] Popup opened: {driver.current_url}")
-            time.sleep(POPUP_SETTLE_WAIT)
-            popup_urls.append(driver.current_url)
-            if wait_for_ads(driver, timeout=3):
-                ads_detected = True
-                debug.append("Monetag elements detected in popup")
-        except (TimeoutException, WebDriverException) as exc:
-            debug.append(f"popup error: {exc}")
-        finally:
-            with contextlib.suppress(WebDriverException):
-                driver.close()
-
-    with contextlib.suppress(WebDriverException):
-        driver.switch_to.window(main_handle)
-
-    if new_handles:
+        ads_detected = inspect_and_close_popups(
+            driver, label, new_handles, main_handle, POPUP_SETTLE_WAIT, popup_urls, debug,
+            watcher,
+        )
         debug.append("returned to main window after closing popup(s)")
 
     if not both_visible:
@@ -181,65 +216,82 @@ def click_games_button(
     )
 
 
-def exercise_games_button(attempts: int = ATTEMPTS) -> list[PlayAttemptResult]:
-    """Run repeated Games-button clicks as described."""
-    results: list[PlayAttemptResult] = []
-    with managed_driver(headless=False) as driver:
+def exercise_games_button(
+    attempts: int = ATTEMPTS,
+    results_path: Path = RESULTS_PATH,
+    headless: bool = True,
+    profile_dir: Optional[Path] = None,
+) -> Counter[str]:
+    """Run repeated Games-button clicks on a dedicated Edge session."""
+    with managed_driver(headless=headless, profile_dir=profile_dir) as driver, ResultLog(
+        "games", results_path
+    ) as log:
+        return exercise_games_button_with(driver, log, attempts)
+
+
+def exercise_games_button_with(
+    driver, log: ResultLog, attempts: int = ATTEMPTS
+) -> Counter[str]:
+    """Run repeated Games-button clicks on ``driver``, streaming each result to ``log``."""
+    if driver.current_url != HOME_URL:  # a shared session may already be home
         driver.get(HOME_URL)
-        time.sleep(1.5)
-        prepare_main_view(driver, "initial load")
-
-        print(f"[setup] Waiting {INITIAL_WAIT} seconds before first click.")
-        time.sleep(INITIAL_WAIT)
-
-        main_handle = driver.current_window_handle
-
-        for attempt in range(1, attempts + 1):
-            if attempt > 1:
-                print(
-                    f"[cycle] Waiting {RETRY_WAIT} seconds before next click."
-                )
-                time.sleep(RETRY_WAIT)
-
-            prepare_main_view(driver, f"attempt {attempt} pre-click")
-            result = click_games_button(driver, attempt, main_handle)
-            results.append(result)
-
-            if result.error:
-                print(f"[!] attempt {attempt}: error -> {result.error}")
-            else:
-                descriptor = "ads detected" if result.ads_detected else "no ads"
-                print(
-                    f"[+] attempt {attempt}: {descriptor} "
-                    f"(buttons_visible={result.buttons_visible}, "
-                    f"popups={len(result.popup_urls)})"
-                )
+    install_ad_observer(driver)
+    wait_for_visible(driver, (By.CSS_SELECTOR, HOME_CSS), HOME_READY_WAIT)
+    prepare_main_view(driver, "initial load")
+
+    main_handle = driver.current_window_handle
+    watcher = target_watcher(driver)
+
+    for attempt in range(1, attempts + 1):
+        idle_wait = INITIAL_WAIT if attempt == 1 else RETRY_WAIT
+        print(f"[cycle] Waiting up to {idle_wait} seconds for the page to idle.")
+        wait_for_page_idle(driver, idle_wait)
+
+        prepare_main_view(driver, f"attempt {attempt} pre-click")
+        result = click_games_button(driver, attempt, main_handle, watcher)
+        # Always return to the home page as requested.
+        return_home(driver, HOME_CSS, GAMES_CSS, HOME_READY_WAIT)
+        if not result.error:
+            note_late_popups(driver, result, main_handle, watcher)
+        log.record(result)
+
+        if result.error:
+            print(f"[!] attempt {attempt}: error -> {result.error}")
+        else:
+            descriptor = "ads detected" if result.ads_detected else "no ads"
+            print(
+                f"[+] attempt {attempt}: {descriptor} "
+                f"(buttons_visible={result.buttons_visible}, "
+                f"popups={len(result.popup_urls)})"
+            )
 
-            # Always return to the home page as requested.
-            driver.get(HOME_URL)
-            time.sleep(1.0)
-            prepare_main_view(driver, f"attempt {attempt} post-home")
+        prepare_main_view(driver, f"attempt {attempt} post-home")
 
-    return results
+    return log.stats
 
 
-def main() -> int:
+def main(argv: list[str]) -> int:
+    visual = "--visual" in argv[1:]
+    persistent = "--persistent-profile" in argv[1:]
+    results_path = RESULTS_PATH.resolve()
     try:
-        results = exercise_games_button()
+        stats = exercise_games_button(
+            results_path=results_path,
+            headless=not visual,
+            profile_dir=profile_dir_for("monetag-games") if persistent else None,
+        )
     except WebDriverException as exc:
         print(f"Failed to initialise Edge WebDriver: {exc}")
         return 1
 
-    ads = [r for r in results if r.ads_detected]
-    errors = [r for r in results if r.error]
-
     print(
-        f"\nCompleted {len(results)} attempts → "
-        f"{len(ads)} with ad activity, {len(errors)} errors."
+        f"\nCompleted {stats['total']} attempts → "
+        f"{stats['ads']} with ad activity, {stats['errors']} errors."
     )
+    print(f"Per-attempt results appended to {results_path}.")
 
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,63 @@
+"""
+Run the navigation and Games-button testers back-to-back on one Edge session.
+
+Sharing the driver skips a second browser cold start and initial page load.
+
+Usage:
+    python -m monetag_suite [--visual] [--persistent-profile]
+
+Runs headless unless ``--visual`` is given. Each run starts from a fresh browser profile;
+``--persistent-profile`` keeps cookies and caches in the suite's own profile directory.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import Counter
+from pathlib import Path
+
+from selenium.common.exceptions import WebDriverException
+
+from monetag_ad_tester import RESULTS_PATH, ResultLog, managed_driver, profile_dir_for, reset
+from monetag_nav_click_tester import exercise_navigation_with
+from monetag_play_button_tester import exercise_games_button_with
+
+
+def run_all(
+    driver, results_path: Path = RESULTS_PATH
+) -> tuple[Counter[str], Counter[str]]:
+    """Run both testers on ``driver``, clearing cookies and returning home in between.
+
+    Results from both suites are appended to ``results_path``; returns their totals.
+    """
+    with ResultLog("navigation", results_path) as log:
+        navigation_stats = exercise_navigation_with(driver, log)
+    reset(driver)
+    with ResultLog("games", results_path) as log:
+        games_stats = exercise_games_button_with(driver, log)
+    return navigation_stats, games_stats
+
+
+def main(argv: list[str]) -> int:
+    visual = "--visual" in argv[1:]
+    profile_dir = profile_dir_for("monetag-suite") if "--persistent-profile" in argv[1:] else None
+    results_path = RESULTS_PATH.resolve()
+    try:
+        with managed_driver(headless=not visual, profile_dir=profile_dir) as driver:
+            navigation_stats, games_stats = run_all(driver, results_path)
+    except WebDriverException as exc:
+        print(f"Failed to initialise Edge WebDriver: {exc}")
+        return 1
+
+    for name, stats in (("navigation", navigation_stats), ("games", games_stats)):
+        print(
+            f"[{name}] {stats['total']} interactions → "
+            f"{stats['ads']} with ad activity, {stats['errors']} errors."
+        )
+    print(f"Per-interaction results appended to {results_path}.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
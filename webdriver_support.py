@@ -0,0 +1,202 @@
+"""
+WebDriver plumbing shared by the Edge and Monetag testers.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+import trio
+import urllib3
+from selenium import webdriver
+
+
+COMMAND_POOL_SIZE = 10  # keep-alive sockets shared by all WebDriver/CDP commands
+# Opt-in persistent profiles live here so later runs reuse cookies, DNS/TLS state and cache.
+PROFILE_ROOT = Path(tempfile.gettempdir())
+
+
+def profile_dir_for(name: str) -> Path:
+    """Return the persistent profile directory reserved for the tester called ``name``.
+
+    Edge locks a user-data directory per browser process, so every tester (and every
+    parallel view) that opts into a persistent profile gets its own.
+    """
+    return PROFILE_ROOT / f"ad-tester-profile-{name}"
+
+
+def pin_command_pool(driver: webdriver.Edge, size: int = COMMAND_POOL_SIZE) -> bool:
+    """Give the WebDriver command executor one keep-alive pool that reuses its sockets.
+
+    Returns False and leaves the executor alone when it is not using a plain
+    urllib3.PoolManager (e.g. when routed through an HTTP or SOCKS proxy).
+    """
+    executor = driver.command_executor
+    current_pool = getattr(executor, "_conn", None)
+    # Exact type: proxy managers subclass PoolManager, and SOCKSProxyManager is not a
+    # ProxyManager, so an isinstance() check would strip the proxy settings.
+    if type(current_pool) is not urllib3.PoolManager:
+        return False
+
+    pool_kwargs = {
+        key: value
+        for key, value in current_pool.connection_pool_kw.items()
+        if key not in ("maxsize", "block")
+    }
+    # Commands all target the local msedgedriver, so a single host pool is enough.
+    executor._conn = urllib3.PoolManager(
+        num_pools=1, maxsize=size, block=True, **pool_kwargs
+    )
+    current_pool.clear()
+    return True
+
+
+class TargetWatcher:
+    """Queue ids of page targets (tabs/popups) as CDP reports them being created.
+
+    Listens for Target.targetCreated on a daemon thread via Selenium's bidi_connection,
+    so callers learn about new windows without diffing driver.window_handles. Target
+    ids double as window handles for switch_to.window(). Target.targetDestroyed events
+    confirm closes requested through expect_closed()/wait_closed(). Call stop() before
+    quitting the driver.
+    """
+
+    def __init__(
+        self, driver: webdriver.Edge, logger: Optional[logging.Logger] = None
+    ) -> None:
+        self._driver = driver
+        self._logger = logger
+        self._created: queue.Queue[str] = queue.Queue()
+        self._subscribed = threading.Event()
+        self._closing: set[str] = set()
+        self._closed = threading.Condition()
+        self._ignored: set[str] = set()
+        self._ignored_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._trio_token: Optional[trio.lowlevel.TrioToken] = None
+        self._cancel_scope: Optional[trio.CancelScope] = None
+        self.active = False
+
+    def start(self, timeout: float = 5.0) -> bool:
+        """Begin listening and return True once the subscription is in place."""
+        self._thread = threading.Thread(target=self._run, name="target-watcher", daemon=True)
+        self._thread.start()
+        self._subscribed.wait(timeout)
+        return self.active
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Cancel the subscription and wait for the listener thread to exit."""
+        token, scope = self._trio_token, self._cancel_scope
+        if token is not None and scope is not None:
+            try:
+                trio.from_thread.run_sync(scope.cancel, trio_token=token)
+            except trio.RunFinishedError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.active = False
+
+    def pending(self) -> bool:
+        """Return True if targets were created since the last drain (no round-trip)."""
+        return not self._created.empty()
+
+    def drain(self) -> list[str]:
+        """Return and forget every target id reported since the previous drain."""
+        created: list[str] = []
+        while True:
+            try:
+                created.append(self._created.get_nowait())
+            except queue.Empty:
+                return self._without_ignored(created)
+
+    def ignore(self, target_ids: Iterable[str]) -> None:
+        """Never report ``target_ids`` (e.g. windows the caller opened and closed itself)."""
+        with self._ignored_lock:
+            self._ignored.update(target_ids)
+
+    def _without_ignored(self, created: list[str]) -> list[str]:
+        with self._ignored_lock:
+            if not self._ignored:
+                return created
+            kept = [target_id for target_id in created if target_id not in self._ignored]
+            self._ignored.difference_update(created)
+        return kept
+
+    def collect(self, settle: float, limit: float = 3.0, wait: float = 0.0) -> list[str]:
+        """Drain like drain(), but once a target is reported wait for the burst to end.
+
+        Returns after ``settle`` seconds pass with no new target, or ``limit`` seconds
+        after the first one. If nothing was reported yet, waits up to ``wait`` seconds
+        for a first target before returning [].
+        """
+        created = self.drain()
+        if not created:
+            if wait <= 0:
+                return created
+            try:
+                created.append(self._created.get(timeout=wait))
+            except queue.Empty:
+                return created
+        deadline = time.monotonic() + limit
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                created.append(self._created.get(timeout=min(settle, remaining)))
+            except queue.Empty:
+                break
+        return self._without_ignored(created)
+
+    def expect_closed(self, target_ids: Iterable[str]) -> None:
+        """Start tracking ``target_ids`` so wait_closed() can see their destruction."""
+        with self._closed:
+            self._closing.update(target_ids)
+
+    def forget(self, target_ids: Iterable[str]) -> None:
+        """Stop tracking ``target_ids`` (e.g. targets that were already gone)."""
+        with self._closed:
+            self._closing.difference_update(target_ids)
+
+    def wait_closed(self, target_ids: Iterable[str], timeout: float) -> bool:
+        """Return True once every id passed to expect_closed() has been destroyed."""
+        target_ids = set(target_ids)
+        with self._closed:
+            closed = self._closed.wait_for(
+                lambda: not (target_ids & self._closing), timeout
+            )
+        self.forget(target_ids)
+        return closed
+
+    def _run(self) -> None:
+        try:
+            trio.run(self._listen)
+        except Exception as exc:  # the websocket drops when the driver quits
+            if self._logger is not None:
+                self._logger.debug("Target watcher stopped: %s", exc)
+        finally:
+            self.active = False
+            self._subscribed.set()
+
+    async def _listen(self) -> None:
+        self._trio_token = trio.lowlevel.current_trio_token()
+        with trio.CancelScope() as self._cancel_scope:
+            async with self._driver.bidi_connection() as connection:
+                session, devtools = connection.session, connection.devtools
+                events = session.listen(
+                    devtools.target.TargetCreated, devtools.target.TargetDestroyed
+                )
+                await session.execute(devtools.target.set_discover_targets(discover=True))
+                self.active = True
+                self._subscribed.set()
+                async for event in events:
+                    if isinstance(event, devtools.target.TargetDestroyed):
+                        with self._closed:
+                            self._closing.discard(str(event.target_id))
+                            self._closed.notify_all()
+                    elif event.target_info.type_ == "page":
+                        self._created.put(str(event.target_info.target_id))